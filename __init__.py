@@ -1,47 +1,58 @@
-
 # __init__.py
+import logging
+import time
+
+_t0 = time.perf_counter()
+# ms per node module (the first one also pays for shared helpers), see also mlist.LIST_STATS
+IMPORT_TIMES = {}
+
+
+def _timed(name, t):
+    IMPORT_TIMES[name] = (time.perf_counter() - t) * 1000
+    return time.perf_counter()
+
+
+_t = _t0
 from .mint import NODE_CLASS_MAPPINGS as MINT_C, NODE_DISPLAY_NAME_MAPPINGS as MINT_N
+_t = _timed("mint", _t)
+from .mintv import NODE_CLASS_MAPPINGS as MINV_C, NODE_DISPLAY_NAME_MAPPINGS as MINV_N
+_t = _timed("mintv", _t)
 from .mstring import NODE_CLASS_MAPPINGS as MSTR_C, NODE_DISPLAY_NAME_MAPPINGS as MSTR_N
+_t = _timed("mstring", _t)
 from .mutil import NODE_CLASS_MAPPINGS as MUTL_C, NODE_DISPLAY_NAME_MAPPINGS as MUTL_N
+_t = _timed("mutil", _t)
+from .mlines import NODE_CLASS_MAPPINGS as MLIN_C, NODE_DISPLAY_NAME_MAPPINGS as MLIN_N
+_t = _timed("mlines", _t)
+from .mod import NODE_CLASS_MAPPINGS as MMOD_C, NODE_DISPLAY_NAME_MAPPINGS as MMOD_N
+_t = _timed("mod", _t)
 
 NODE_CLASS_MAPPINGS = {}
 NODE_DISPLAY_NAME_MAPPINGS = {}
 
 NODE_CLASS_MAPPINGS.update(MINT_C);  NODE_DISPLAY_NAME_MAPPINGS.update(MINT_N)
+NODE_CLASS_MAPPINGS.update(MINV_C);  NODE_DISPLAY_NAME_MAPPINGS.update(MINV_N)
 NODE_CLASS_MAPPINGS.update(MSTR_C);  NODE_DISPLAY_NAME_MAPPINGS.update(MSTR_N)
 NODE_CLASS_MAPPINGS.update(MUTL_C);  NODE_DISPLAY_NAME_MAPPINGS.update(MUTL_N)
+NODE_CLASS_MAPPINGS.update(MLIN_C);  NODE_DISPLAY_NAME_MAPPINGS.update(MLIN_N)
+NODE_CLASS_MAPPINGS.update(MMOD_C);  NODE_DISPLAY_NAME_MAPPINGS.update(MMOD_N)
+
+# time every node's FUNCTION for /mnodes/metrics (no-op with MNODES_METRICS=0)
+from . import mmetrics
+mmetrics.instrument_nodes(NODE_CLASS_MAPPINGS)
 
 # serve frontend js from mnodes/js
 WEB_DIRECTORY = "./js"
 __all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS", "WEB_DIRECTORY"]
 
-# API route for sidecar preview
-import os, base64
-from aiohttp import web
-from server import PromptServer
-import folder_paths
-
-@PromptServer.instance.routes.get("/mnodes/lora_sidecar")
-async def mnodes_lora_sidecar(request):
-    name = request.rel_url.query.get("name", "")
-    lora_path = folder_paths.get_full_path("loras", name)
-    if not lora_path or not os.path.isfile(lora_path):
-        return web.json_response({"error": "lora not found"}, status=404)
-
-    base, _ = os.path.splitext(lora_path)
-    txtp = base + ".txt"
-    pngp = base + ".png"
+# API routes for sidecar preview (see mroutes.py)
+from . import mroutes  # noqa: F401
+_t = _timed("mroutes", _t)
 
-    meta = ""
-    if os.path.isfile(txtp):
-        with open(txtp, "r", encoding="utf-8", errors="replace") as f:
-            meta = f.read()
-
-    thumb_b64 = ""
-    if os.path.isfile(pngp):
-        # keep it small, if your thumbs are huge, resize them earlier
-        with open(pngp, "rb") as f:
-            thumb_b64 = base64.b64encode(f.read()).decode("ascii")
-
-    return web.json_response({"meta": meta, "thumb_b64": thumb_b64})
+# fold constant chains of pure mnodes out of every submitted prompt (see mfold.py)
+from server import PromptServer
+from . import mfold
+PromptServer.instance.add_on_prompt_handler(mfold.on_prompt)
 
+IMPORT_TIMES["total"] = (time.perf_counter() - _t0) * 1000
+logging.info(f"[mnodes] imported in {IMPORT_TIMES['total']:.0f} ms ("
+             + ", ".join(f"{k} {v:.0f}" for k, v in IMPORT_TIMES.items() if k != "total") + ")")
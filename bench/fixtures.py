@@ -0,0 +1,114 @@
+# fixtures.py
+# Synthetic inputs for bench/run.py: LoRA .safetensors (written by hand, no safetensors
+# package needed), .txt/.png sidecars, option lists and wildcard files.
+
+import json
+import os
+import struct
+
+import numpy as np
+
+# fake model the stub patcher knows: unet blocks + text encoder layers
+UNET_KEYS = [f"blocks.{i}.attn.{p}.weight" for i in range(96) for p in ("to_q", "to_k", "to_v", "to_out")]
+CLIP_KEYS = [f"text_model.encoder.layers.{i}.self_attn.{p}_proj.weight" for i in range(12) for p in "qkvo"]
+
+
+def _flat(key):
+    return key[:-len(".weight")].replace(".", "_")
+
+
+def write_safetensors(path, tensors, metadata=None):
+    """tensors: name -> numpy array (float32 / float16). Header padded to 8 bytes like the real writer."""
+    dtypes = {np.dtype(np.float32): "F32", np.dtype(np.float16): "F16"}
+    header, off = {}, 0
+    for name, a in tensors.items():
+        header[name] = {"dtype": dtypes[a.dtype], "shape": list(a.shape), "data_offsets": [off, off + a.nbytes]}
+        off += a.nbytes
+    if metadata:
+        header["__metadata__"] = metadata
+    raw = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    raw += b" " * (-len(raw) % 8)
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(raw)))
+        f.write(raw)
+        for a in tensors.values():
+            f.write(np.ascontiguousarray(a).tobytes())
+
+
+def write_lora(path, size_mb, dtype=np.float16, seed=0):
+    """kohya-style LoRA over UNET_KEYS + CLIP_KEYS, rank picked so the file is ~size_mb."""
+    rng = np.random.default_rng(seed)
+    targets = [f"lora_unet_{_flat(k)}" for k in UNET_KEYS] + [f"lora_te_{_flat(k)}" for k in CLIP_KEYS]
+    dim = 1280
+    per_rank = len(targets) * 2 * dim * np.dtype(dtype).itemsize
+    rank = max(1, int(size_mb * 2**20 / per_rank))
+    tensors = {}
+    for t in targets:
+        tensors[f"{t}.lora_down.weight"] = rng.standard_normal((rank, dim), dtype=np.float32).astype(dtype)
+        tensors[f"{t}.lora_up.weight"] = (rng.standard_normal((dim, rank), dtype=np.float32) * 0.01).astype(dtype)
+        tensors[f"{t}.alpha"] = np.array(rank, dtype=np.float32)
+    write_safetensors(path, tensors, {"ss_network_dim": str(rank)})
+    return path
+
+
+def write_sidecar_txt(path, name, desc_kb=32):
+    # same layout civs.sh writes: header fields, then the long description block
+    header = (
+        f'modelName:"{name} model"\n'
+        f'versionName:"v1.0"\n'
+        f'baseModel:"SDXL 1.0"\n'
+        f'trainedWords:"{name}_trigger, style, detailed"\n'
+        f'recommendedWeight:"0.8"\n'
+        f'tags:"style, test"\n'
+        f'example:"a photo, <lora:{name}:0.75>"\n'
+    )
+    para = "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.</p>\n"
+    desc = para * max(1, desc_kb * 1024 // len(para))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header)
+        f.write("\n--- modelDescription ---\n")
+        f.write(desc)
+        f.write("\n--- versionDescription ---\n")
+        f.write(desc[: len(desc) // 4])
+    return path
+
+
+def write_png(path, side):
+    # smooth gradient + a little noise, compresses like a real render, not like static
+    from PIL import Image
+    y, x = np.mgrid[0:side, 0:side].astype(np.float32) / side
+    rng = np.random.default_rng(side)
+    img = np.stack([x, y, (x + y) / 2], axis=-1) * 230 + rng.integers(0, 25, (side, side, 3))
+    Image.fromarray(img.astype(np.uint8), "RGB").save(path, compress_level=1)
+    return path
+
+
+def option_lines(n, seed=0):
+    """n option lines, a few blank ones sprinkled in (skipped by the pickers)."""
+    rng = np.random.default_rng(seed)
+    words = ["red", "green", "blue", "silver", "golden", "pale", "dark", "neon", "matte", "glossy"]
+    picks = rng.integers(0, len(words), (n, 3))
+    lines = [f"{words[a]} {words[b]} {words[c]} {i}" for i, (a, b, c) in enumerate(picks)]
+    for i in range(0, n, 97):
+        lines[i] += "\n"
+    return "\n".join(lines) + "\n"
+
+
+def write_lines(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(option_lines(n))
+    return path
+
+
+def drop_page_cache(path):
+    # best effort: ask the kernel to forget the file's pages, so "cold" reads hit the disk
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except (AttributeError, OSError):
+        pass
+    finally:
+        os.close(fd)
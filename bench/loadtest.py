@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# loadtest.py
+# HTTP load test for the sidecar routes (mroutes.py), outside ComfyUI.
+#
+#   python bench/loadtest.py [--route sidecar] [--concurrency 32] [--duration 10] [--loras 200] [--out r.json]
+#
+# The routes are served by a local aiohttp app (stub PromptServer from bench/stubs) over a
+# generated lora folder whose .txt sidecars range from 1 KB to 1 MB, some with a .png.
+# Load comes from --clients separate processes so the client side doesn't eat the
+# server's event loop. Routes:
+#   sidecar       GET  /mnodes/lora_sidecar?name=        (what each loader node fetches)
+#   sidecar_full  GET  /mnodes/lora_sidecar?name=&full=1 (with the description blocks)
+#   batch         POST /mnodes/lora_sidecar_batch        (--batch names per request)
+#   thumb         GET  /mnodes/lora_thumb?name=&size=512
+#   thumb_304     same, revalidating with If-None-Match  (a tab reloading the graph)
+#   mixed         batch + thumb, like a tab opening a workflow
+#
+# Report (json to --out, default stdout; summary to stderr): requests/sec, latency
+# p50/p90/p99/max, bytes transferred, status counts, and event-loop lag of the
+# server loop (a 5 ms ticker, lag = how late it woke up, i.e. time the loop was blocked).
+# --no-cache turns off the in-memory sidecar caches to compare against the cold path.
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ROUTES = ("sidecar", "sidecar_full", "batch", "thumb", "thumb_304", "mixed")
+SIDECAR_KB = (1, 16, 64, 256, 1024)
+LAG_TICK_S = 0.005
+
+
+def make_library(root, n, png_every=3):
+    """n tiny loras with sidecars cycling through SIDECAR_KB, every png_every-th gets a .png."""
+    import fixtures
+    ldir = os.path.join(root, "models", "loras")
+    os.makedirs(ldir, exist_ok=True)
+    names = []
+    pngs = {}
+    for i in range(n):
+        kb = SIDECAR_KB[i % len(SIDECAR_KB)]
+        name = f"sub{i % 8}/lora_{i:05d}_{kb}kb.safetensors"
+        path = os.path.join(ldir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fixtures.write_safetensors(path, {})
+        fixtures.write_sidecar_txt(path[:-len(".safetensors")] + ".txt", name, desc_kb=kb)
+        if i % png_every == 0:
+            side = (768, 1536)[i % 2]
+            if side not in pngs:
+                pngs[side] = fixtures.write_png(os.path.join(root, f"src_{side}.png"), side)
+            shutil.copyfile(pngs[side], path[:-len(".safetensors")] + ".png")
+        names.append(name)
+    return names
+
+
+# ---------------- client (runs in its own process) ----------------
+
+def _pct(s, p):
+    if not s:
+        return None
+    return s[min(len(s) - 1, max(0, int(round(p / 100 * len(s) + 0.5)) - 1))]
+
+
+def client_main(base, route, names, concurrency, duration, batch, seed):
+    return asyncio.run(_client(base, route, names, concurrency, duration, batch, seed))
+
+
+async def _client(base, route, names, concurrency, duration, batch, seed):
+    import aiohttp
+
+    rnd = random.Random(seed)
+    thumb_names = [n for i, n in enumerate(names) if i % 3 == 0]
+    etags = {}
+    out = {"lat": [], "bytes": 0, "status": {}, "errors": 0}
+
+    def next_request():
+        r = route if route != "mixed" else rnd.choice(("batch", "thumb"))
+        if r in ("sidecar", "sidecar_full"):
+            q = {"name": rnd.choice(names)}
+            if r == "sidecar_full":
+                q["full"] = "1"
+            return "GET", "/mnodes/lora_sidecar", q, None, {}
+        if r == "batch":
+            return "POST", "/mnodes/lora_sidecar_batch", None, {"names": rnd.sample(names, min(batch, len(names)))}, {}
+        name = rnd.choice(thumb_names)
+        headers = {"If-None-Match": etags[name]} if r == "thumb_304" and name in etags else {}
+        return "GET", "/mnodes/lora_thumb", {"name": name, "size": "512"}, None, headers
+
+    async def worker(session, deadline):
+        while time.perf_counter() < deadline:
+            method, path, params, body, headers = next_request()
+            t = time.perf_counter()
+            try:
+                async with session.request(method, base + path, params=params, json=body, headers=headers) as resp:
+                    data = await resp.read()
+                    if "ETag" in resp.headers and params and "name" in params:
+                        etags[params["name"]] = resp.headers["ETag"]
+            except aiohttp.ClientError:
+                out["errors"] += 1
+                continue
+            out["lat"].append(time.perf_counter() - t)
+            out["bytes"] += len(data)
+            out["status"][resp.status] = out["status"].get(resp.status, 0) + 1
+
+    conn = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=conn) as session:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(worker(session, deadline) for _ in range(concurrency)))
+    return out
+
+
+# ---------------- server side ----------------
+
+class LoopLag:
+    """Ticks every LAG_TICK_S on the server loop and records how late each wakeup was."""
+
+    def __init__(self):
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            t = loop.time()
+            await asyncio.sleep(LAG_TICK_S)
+            self.samples.append(max(0.0, loop.time() - t - LAG_TICK_S))
+
+    def start(self):
+        self.samples.clear()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def report(self):
+        s = sorted(self.samples)
+        return {
+            "ticks": len(s),
+            "p50_ms": (_pct(s, 50) or 0) * 1000,
+            "p99_ms": (_pct(s, 99) or 0) * 1000,
+            "max_ms": (s[-1] if s else 0) * 1000,
+            "blocked_ms": sum(s) * 1000,  # total time the loop was late waking up
+            "stalls_over_50ms": sum(1 for x in s if x > 0.05),
+        }
+
+
+async def serve_and_load(args, names):
+    from aiohttp import web
+    from server import PromptServer
+    import mnodes  # noqa: F401, registers the routes
+
+    app = web.Application(client_max_size=64 * 2**20)
+    app.add_routes(PromptServer.instance.routes)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+
+    loop = asyncio.get_running_loop()
+    lag = LoopLag()
+    ctx = multiprocessing.get_context("spawn")
+    per_client = max(1, args.concurrency // args.clients)
+    try:
+        with ProcessPoolExecutor(max_workers=args.clients, mp_context=ctx) as pool:
+            if args.warmup > 0:
+                await asyncio.gather(*(loop.run_in_executor(
+                    pool, client_main, base, args.route, names, per_client, args.warmup, args.batch, 1000 + i)
+                    for i in range(args.clients)))
+            lag.start()
+            t0 = time.perf_counter()
+            parts = await asyncio.gather(*(loop.run_in_executor(
+                pool, client_main, base, args.route, names, per_client, args.duration, args.batch, i)
+                for i in range(args.clients)))
+            wall = time.perf_counter() - t0
+            await lag.stop()
+    finally:
+        await runner.cleanup()
+
+    lat = sorted(x for p in parts for x in p["lat"])
+    status = {}
+    for p in parts:
+        for k, v in p["status"].items():
+            status[str(k)] = status.get(str(k), 0) + v
+    nbytes = sum(p["bytes"] for p in parts)
+    ms = lambda v: None if v is None else v * 1000
+    return {
+        "meta": {
+            "route": args.route, "concurrency": per_client * args.clients, "clients": args.clients,
+            "duration_s": args.duration, "loras": len(names), "batch": args.batch,
+            "sidecar_cache": not args.no_cache, "cpus": os.cpu_count(),
+        },
+        "requests": len(lat),
+        "errors": sum(p["errors"] for p in parts),
+        "rps": len(lat) / wall if wall else None,
+        "latency_ms": {
+            "mean": ms(sum(lat) / len(lat)) if lat else None,
+            "p50": ms(_pct(lat, 50)), "p90": ms(_pct(lat, 90)), "p99": ms(_pct(lat, 99)),
+            "max": ms(lat[-1] if lat else None),
+        },
+        "bytes": nbytes,
+        "mb_per_s": nbytes / 2**20 / wall if wall else None,
+        "status": status,
+        "loop_lag": lag.report(),
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="load test the mnodes sidecar routes on a local aiohttp app")
+    ap.add_argument("--route", choices=ROUTES, default="sidecar")
+    ap.add_argument("--concurrency", type=int, default=32, help="requests in flight, split across --clients")
+    ap.add_argument("--clients", type=int, default=2, help="client processes")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds of measured load")
+    ap.add_argument("--warmup", type=float, default=1.0, help="seconds of unmeasured load first (fills caches)")
+    ap.add_argument("--loras", type=int, default=200, help="generated loras (sidecars of 1 KB .. 1 MB)")
+    ap.add_argument("--batch", type=int, default=16, help="names per batch request")
+    ap.add_argument("--port", type=int, default=0, help="0 = any free port")
+    ap.add_argument("--no-cache", action="store_true", help="MNODES_SIDECAR_CACHE_MB=0, parse on every request")
+    ap.add_argument("--out", default="-", help="json report path (default stdout)")
+    args = ap.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="mnodes-load-")
+    os.environ["MNODES_BENCH_ROOT"] = root
+    os.environ["MNODES_CACHE_DIR"] = os.path.join(root, "cache")
+    if args.no_cache:
+        os.environ["MNODES_SIDECAR_CACHE_MB"] = "0"
+    sys.path.insert(0, os.path.join(BENCH_DIR, "stubs"))
+    sys.path.insert(0, BENCH_DIR)
+    try:
+        names = make_library(root, args.loras)
+        from run import _import_pack
+        _import_pack()
+        if args.no_cache:
+            from mnodes import msidecar
+            msidecar._CACHE.budget = 0
+        report = asyncio.run(serve_and_load(args, names))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    lat, lag = report["latency_ms"], report["loop_lag"]
+    print(f"{args.route}: {report['requests']} req, {report['rps']:.0f} req/s, "
+          f"p50 {lat['p50']:.2f} / p99 {lat['p99']:.2f} / max {lat['max']:.2f} ms, "
+          f"{report['mb_per_s']:.1f} MB/s, status {report['status']}, errors {report['errors']}; "
+          f"loop lag p99 {lag['p99_ms']:.2f} ms, max {lag['max_ms']:.1f} ms, blocked {lag['blocked_ms']:.0f} ms",
+          file=sys.stderr)
+    if args.out == "-":
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    else:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
+    return 1 if report["errors"] or not report["requests"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
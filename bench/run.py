@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# run.py
+# Benchmarks for every mnodes node, outside ComfyUI.
+#
+#   python bench/run.py [--quick] [--filter REGEX] [--out report.json] [--compare old.json] [--fail-over 1.25]
+#
+# bench/stubs stands in for folder_paths, comfy.*, server and nodes, everything else
+# (numpy, torch, Pillow) is the real thing. Inputs are generated into a temp dir:
+# 100k-line option lists, 1k..4k thumbnails, LoRA .safetensors of several sizes.
+#
+# Per case: ops/sec, mean/p50/p99/min ms over the timed reps, then one extra call for
+# memory: Python peak (tracemalloc) and process peak RSS (VmHWM, reset before the call
+# where the kernel allows it). "cold" cases clear mnodes' caches (and ask the kernel to
+# drop the file's pages) before every rep, "warm" ones run against filled caches.
+#
+# The JSON report goes to --out (default stdout), a summary table to stderr.
+# --compare prints p50 ratios against an older report, --fail-over exits 1 when any
+# case got slower than that ratio.
+
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+
+class Case:
+    def __init__(self, name, fn, before=None, warm=True, max_reps=200):
+        self.name = name
+        self.fn = fn            # the timed call
+        self.before = before    # untimed, runs before every call (cache clearing for cold cases)
+        self.warm = warm        # one untimed call first
+        self.max_reps = max_reps
+
+
+# ---------------- environment ----------------
+
+def _setup_env(root):
+    os.environ["MNODES_BENCH_ROOT"] = root
+    os.environ["MNODES_CACHE_DIR"] = os.path.join(root, "cache")
+    os.environ.setdefault("MNODES_LORA_CACHE_MB", "4096")
+    sys.path.insert(0, os.path.join(BENCH_DIR, "stubs"))
+    sys.path.insert(0, BENCH_DIR)
+
+
+def _import_pack():
+    # the pack dir is imported as package "mnodes" whatever the checkout is called
+    spec = importlib.util.spec_from_file_location(
+        "mnodes", os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR])
+    pack = importlib.util.module_from_spec(spec)
+    sys.modules["mnodes"] = pack
+    spec.loader.exec_module(pack)
+    return pack
+
+
+# ---------------- measuring ----------------
+
+def _pct(sorted_ns, p):
+    i = min(len(sorted_ns) - 1, max(0, int(round(p / 100 * len(sorted_ns) + 0.5)) - 1))
+    return sorted_ns[i] / 1e6
+
+
+def _rss_kb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    # "5" resets VmHWM to the current RSS (linux >= 4.0)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _lifetime_peak_rss_kb():
+    # fallback when VmHWM can't be reset: ru_maxrss, process lifetime, None without resource (windows)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform == "darwin" else peak  # bytes on macOS, KB elsewhere
+
+
+def measure(case, min_reps, budget_s):
+    times = []
+    if case.warm:
+        if case.before:
+            case.before()
+        case.fn()
+    deadline = time.perf_counter() + budget_s
+    gc.collect()
+    while len(times) < case.max_reps and (len(times) < min_reps or time.perf_counter() < deadline):
+        if case.before:
+            case.before()
+        t = time.perf_counter_ns()
+        case.fn()
+        times.append(time.perf_counter_ns() - t)
+
+    # memory pass, separate so tracemalloc doesn't skew the timings
+    if case.before:
+        case.before()
+    gc.collect()
+    rss0 = _rss_kb("VmRSS")
+    reset = _reset_peak_rss()
+    tracemalloc.start()
+    case.fn()
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    hwm = _rss_kb("VmHWM") if reset else None
+    if hwm is None:
+        hwm = _lifetime_peak_rss_kb()
+
+    total_s = sum(times) / 1e9
+    s = sorted(times)
+    return {
+        "reps": len(times),
+        "ops_per_sec": len(times) / total_s if total_s else None,
+        "mean_ms": total_s * 1000 / len(times),
+        "p50_ms": _pct(s, 50),
+        "p99_ms": _pct(s, 99),
+        "min_ms": s[0] / 1e6,
+        "py_peak_kb": py_peak / 1024,
+        "rss_peak_mb": hwm / 1024 if hwm is not None else None,
+        "rss_peak_delta_mb": (hwm - rss0) / 1024 if reset and hwm is not None and rss0 is not None else None,
+    }
+
+
+# ---------------- cases ----------------
+
+def _int_args(cls):
+    # representative values for every INT socket of a scalar int node
+    vals = {"a": 123456789, "b": 97, "x": -123456, "lo": 0, "hi": 1000}
+    req = cls.INPUT_TYPES()["required"]
+    return {k: vals.get(k, 7) for k, spec in req.items() if spec[0] == "INT"}
+
+
+def int_cases(pack):
+    from mnodes import mint, mod
+    for key, cls in {**mint.NODE_CLASS_MAPPINGS, **mod.NODE_CLASS_MAPPINGS}.items():
+        node, fn = cls(), getattr(cls, cls.FUNCTION)
+        if key == "MIntExpr":
+            short = "clamp((a // 8) * 8 + b, 64, 4096)"
+            long_ = " + ".join(f"min(a * {i}, b ** 2) % (c + {i + 1})" for i in range(100))
+            for label, expr in (("short", short), ("long", long_)):
+                yield Case(f"mint.{key}[{label}]", lambda n=node, e=expr: n.go(e, a=1000, b=37, c=5))
+                # first sight of an expression: parse + compile
+                yield Case(f"mint.{key}[{label},uncached]", lambda n=node, e=expr: n.go(e, a=1000, b=37, c=5),
+                           before=mint.compile_int_expr.cache_clear, warm=False)
+            continue
+        args = _int_args(cls)
+        yield Case(f"{cls.__module__.split('.')[-1]}.{key}", lambda n=node, f=fn, a=args: f(n, **a))
+
+
+def intlist_cases(pack, sizes):
+    from mnodes import mintv
+    import random
+    rnd = random.Random(1)
+    for n in sizes:
+        a = [rnd.randint(-10**6, 10**6) for _ in range(n)]
+        b = [rnd.randint(-1000, 1000) for _ in range(n)]
+        e = [rnd.randint(0, 5) for _ in range(n)]
+        big = [x * 10**12 for x in a]  # outside int32, takes the scalar path
+        bin_ = mintv.IntListBinary()
+        yield Case(f"mintv.MIntListBinary[add,{n}]", lambda: bin_.go(["add"], a, b))
+        yield Case(f"mintv.MIntListBinary[mod,{n}]", lambda: bin_.go(["mod"], a, b))
+        yield Case(f"mintv.MIntListBinary[pow,{n}]", lambda: bin_.go(["pow"], b, e))
+        yield Case(f"mintv.MIntListBinary[add,{n},int64]", lambda: bin_.go(["add"], big, b))
+        un = mintv.IntListUnary()
+        yield Case(f"mintv.MIntListUnary[abs,{n}]", lambda: un.go(["abs"], a))
+        cmp_ = mintv.IntListCompare()
+        yield Case(f"mintv.MIntListCompare[lt,{n}]", lambda: cmp_.go(["lt"], a, b))
+
+
+def string_cases(pack, sizes):
+    from mnodes import mstring
+    import fixtures
+    clear = mstring._nonblank_lines.cache_clear
+    for n in sizes:
+        opts = fixtures.option_lines(n)
+        text = "a SKIN portrait, SKIN tones, " * 4
+        pick = mstring.MStringPickIndex()
+        yield Case(f"mstring.MStringPickIndex[{n}]", lambda: pick.go(n // 2, opts))
+        yield Case(f"mstring.MStringPickIndex[{n},cold]", lambda: pick.go(n // 2, opts), before=clear, warm=False)
+
+        batch = mstring.MStringPickIndexBatch()
+        idx = list(range(0, n, max(1, n // 1000)))
+        yield Case(f"mstring.MStringPickIndexBatch[{n},{len(idx)} idx]", lambda: batch.go(idx, [opts]))
+
+        rx = mstring.MRegexReplaceFromLines()
+        yield Case(f"mstring.MRegexReplaceFromLines[{n}]",
+                   lambda: rx.go(12345, text, "SKIN", opts, False, False, True, 0))
+        yield Case(f"mstring.MRegexReplaceFromLines[{n},cold]",
+                   lambda: rx.go(12345, text, "SKIN", opts, False, False, True, 0), before=clear, warm=False)
+
+        rxb = mstring.MRegexReplaceFromLinesBatch()
+        for stepping in ("chain", "counter"):
+            yield Case(f"mstring.MRegexReplaceFromLinesBatch[{n},1000,{stepping}]",
+                       lambda s=stepping: rxb.go([12345], [1000], [text], ["SKIN"], [opts], [False], [False],
+                                                 [True], [0], [s]))
+
+        step = mstring.MSeedAtStep()
+        yield Case(f"mstring.MSeedAtStep[{n}]", lambda: step.go(12345, 10**12, opts))
+
+
+def lines_cases(pack, root, sizes):
+    from mnodes import mlines
+    import fixtures
+    wdir = os.path.join(root, "models", "wildcards")
+    os.makedirs(wdir, exist_ok=True)
+
+    def cold():
+        mlines._SOURCES.clear()
+        shutil.rmtree(mlines.INDEX_DIR, ignore_errors=True)
+
+    node = mlines.MFileLinePick()
+    for n in sizes:
+        fixtures.write_lines(os.path.join(wdir, f"opts_{n}.txt"), n)
+        f = f"opts_{n}.txt"
+        yield Case(f"mlines.MFileLinePick[{n},seeded]", lambda f=f: node.go(f, "seeded", 12345, 0))
+        yield Case(f"mlines.MFileLinePick[{n},index]", lambda f=f, n=n: node.go(f, "index", 0, n // 2))
+        # first use of a file: mmap + newline scan + .npy written
+        yield Case(f"mlines.MFileLinePick[{n},cold]", lambda f=f: node.go(f, "seeded", 12345, 0),
+                   before=cold, warm=False, max_reps=50)
+
+
+def util_cases(pack, root, lora_sizes, thumb_sides):
+    from mnodes import mlora, mutil
+    import fixtures
+    from comfy.model_patcher import CLIP, ModelPatcher
+
+    ldir = os.path.join(root, "models", "loras")
+    os.makedirs(ldir, exist_ok=True)
+    model, clip = ModelPatcher(fixtures.UNET_KEYS), CLIP(fixtures.CLIP_KEYS)
+
+    group = mutil.MGroupInputs()
+    kw = {name: 1 for name in mutil.MGroupInputs.RETURN_NAMES}
+    yield Case("mutil.MGroupInputs", lambda: group.go(**kw))
+
+    loader = mutil.MExtendedLoraLoader()
+    for mb in lora_sizes:
+        name = f"lora_{mb}mb.safetensors"
+        path = fixtures.write_lora(os.path.join(ldir, name), mb)
+        fixtures.write_sidecar_txt(path[:-len(".safetensors")] + ".txt", name)
+
+        def cold(path=path):
+            mlora.LORA_CACHE.clear()
+            fixtures.drop_page_cache(path)
+
+        for mode in mlora.LOAD_MODES:
+            for fp16 in (False, True):
+                tag = f"{mb}MB,{mode}{',fp16' if fp16 else ''}"
+                call = (lambda name=name, mode=mode, fp16=fp16:
+                        loader.load(model, clip, name, 0.8, 0.8, True, 0, False, mode, fp16))
+                if fp16:  # only the cold load differs, the cached dict is just smaller
+                    yield Case(f"mutil.MExtendedLoraLoader[{tag},cold]", call, before=cold, warm=False, max_reps=20)
+                    continue
+                yield Case(f"mutil.MExtendedLoraLoader[{tag}]", call)
+                yield Case(f"mutil.MExtendedLoraLoader[{tag},cold]", call, before=cold, warm=False, max_reps=20)
+
+    for side in thumb_sides:
+        name = f"thumb_{side}.safetensors"
+        path = fixtures.write_lora(os.path.join(ldir, name), 1)
+        fixtures.write_png(path[:-len(".safetensors")] + ".png", side)
+        for max_res in (0, 512):
+            call = lambda name=name, r=max_res: loader.load(model, clip, name, 0.8, 0.8, False, r)
+            yield Case(f"mutil.MExtendedLoraLoader[thumb {side}px,max_res={max_res},cold]", call,
+                       before=mutil.THUMB_CACHE.clear, warm=False, max_reps=20)
+        yield Case(f"mutil.MExtendedLoraLoader[thumb {side}px,max_res=512]", call)
+
+    first = f"lora_{lora_sizes[0]}mb.safetensors"
+    yield Case("mutil.MExtendedLoraLoader.IS_CHANGED", lambda: mutil.MExtendedLoraLoader.IS_CHANGED(first))
+    yield Case("mutil.MExtendedLoraLoader.IS_CHANGED[content]",
+               lambda: mutil.MExtendedLoraLoader.IS_CHANGED(first, fingerprint_content=True))
+
+    stacked = mutil.MStackedLoraLoader()
+    names = []
+    for i in range(mutil.STACK_SLOTS):
+        names.append(f"stack_{i}.safetensors")
+        fixtures.write_lora(os.path.join(ldir, names[-1]), lora_sizes[0], seed=i)
+    skw = {}
+    for i, name in enumerate(names, start=1):
+        skw[f"lora{i}"], skw[f"lora{i}_strength"] = name, 0.5
+    call = lambda: stacked.load(model, clip, False, **skw)
+    yield Case(f"mutil.MStackedLoraLoader[5x{lora_sizes[0]}MB]", call)
+
+    def stack_cold():
+        mlora.LORA_CACHE.clear()
+        for name in names:
+            fixtures.drop_page_cache(os.path.join(ldir, name))
+    yield Case(f"mutil.MStackedLoraLoader[5x{lora_sizes[0]}MB,cold]", call, before=stack_cold, warm=False,
+               max_reps=20)
+
+
+# ---------------- report ----------------
+
+def _meta(pack, quick):
+    def ver(mod):
+        try:
+            return __import__(mod).__version__
+        except Exception:
+            return None
+    try:
+        commit = subprocess.run(["git", "-C", REPO_DIR, "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "quick": quick,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": ver("numpy"), "torch": ver("torch"), "PIL": ver("PIL"),
+        "import_ms": getattr(pack, "IMPORT_TIMES", {}),
+    }
+
+
+def _fmt(v, spec):
+    return format(v, spec) if v is not None else format("-", f">{spec.split('.')[0]}")
+
+
+def _print_table(results, out=sys.stderr):
+    w = max([len(k) for k in results] + [4])
+    print(f"{'case':<{w}}  {'ops/s':>10}  {'p50 ms':>9}  {'p99 ms':>9}  {'py MB':>7}  {'rss MB':>7}", file=out)
+    for k, r in results.items():
+        print(f"{k:<{w}}  {r['ops_per_sec']:>10.1f}  {r['p50_ms']:>9.3f}  {r['p99_ms']:>9.3f}  "
+              f"{r['py_peak_kb'] / 1024:>7.1f}  {_fmt(r['rss_peak_mb'], '7.0f')}", file=out)
+
+
+def compare(old, new, fail_over=None, out=sys.stderr):
+    """Print p50 old -> new per case, returns the cases slower than fail_over."""
+    worse = []
+    w = max([len(k) for k in new] + [4])
+    print(f"\n{'case':<{w}}  {'old p50':>9}  {'new p50':>9}  {'ratio':>6}", file=out)
+    for k, r in new.items():
+        o = old.get(k)
+        if o is None or not o["p50_ms"]:
+            print(f"{k:<{w}}  {'-':>9}  {r['p50_ms']:>9.3f}  {'new':>6}", file=out)
+            continue
+        ratio = r["p50_ms"] / o["p50_ms"]
+        flag = ""
+        if fail_over and ratio > fail_over:
+            worse.append(k)
+            flag = "  SLOWER"
+        print(f"{k:<{w}}  {o['p50_ms']:>9.3f}  {r['p50_ms']:>9.3f}  {ratio:>6.2f}{flag}", file=out)
+    return worse
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="benchmark every mnodes node with stubbed ComfyUI modules")
+    ap.add_argument("--quick", action="store_true", help="small sizes, for a smoke run")
+    ap.add_argument("--filter", default="", help="regex, only cases whose name matches")
+    ap.add_argument("--min-reps", type=int, default=5)
+    ap.add_argument("--budget", type=float, default=1.0, help="seconds of timed reps per case (after min-reps)")
+    ap.add_argument("--out", default="-", help="json report path (default stdout)")
+    ap.add_argument("--compare", help="older json report to compare p50s against")
+    ap.add_argument("--fail-over", type=float, default=None, help="exit 1 if any p50 ratio exceeds this")
+    ap.add_argument("--keep", action="store_true", help="keep the generated inputs dir")
+    args = ap.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="mnodes-bench-")
+    _setup_env(root)
+    try:
+        pack = _import_pack()
+        if args.quick:
+            line_sizes, lora_sizes, thumb_sides = (1_000, 10_000), (4, 16), (1024,)
+        else:
+            line_sizes, lora_sizes, thumb_sides = (1_000, 100_000), (16, 128, 512), (1024, 4096)
+
+        groups = [
+            int_cases(pack),
+            intlist_cases(pack, (1_000, 100_000) if not args.quick else (1_000,)),
+            string_cases(pack, line_sizes),
+            lines_cases(pack, root, line_sizes),
+            util_cases(pack, root, lora_sizes, thumb_sides),
+        ]
+        rx = re.compile(args.filter)
+        results = {}
+        for group in groups:
+            for case in group:
+                if not rx.search(case.name):
+                    continue
+                print(f"  {case.name} ...", file=sys.stderr, end="", flush=True)
+                results[case.name] = measure(case, args.min_reps, args.budget)
+                print(f" {results[case.name]['p50_ms']:.3f} ms", file=sys.stderr)
+
+        report = {"meta": _meta(pack, args.quick), "cases": results}
+        _print_table(results)
+        if args.out == "-":
+            json.dump(report, sys.stdout, indent=1)
+            print()
+        else:
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=1)
+
+        if args.compare:
+            with open(args.compare) as f:
+                old = json.load(f)["cases"]
+            if compare(old, results, args.fail_over):
+                return 1
+        return 0
+    finally:
+        if args.keep:
+            print(f"inputs kept in {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
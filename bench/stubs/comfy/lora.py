@@ -0,0 +1,28 @@
+# stand-in for comfy.lora: kohya-style key mapping and patch dicts, no weight math
+# (ComfyUI applies patches lazily at sampling time, so neither does this)
+
+
+def model_lora_keys_unet(model, key_map=None):
+    key_map = {} if key_map is None else key_map
+    for k in model.state_keys:
+        key_map["lora_unet_{}".format(k[:-len(".weight")].replace(".", "_"))] = k
+    return key_map
+
+
+def model_lora_keys_clip(model, key_map=None):
+    key_map = {} if key_map is None else key_map
+    for k in model.state_keys:
+        key_map["lora_te_{}".format(k[:-len(".weight")].replace(".", "_"))] = k
+    return key_map
+
+
+def load_lora(lora, to_load, log_missing=True):
+    patch_dict = {}
+    for prefix, target in to_load.items():
+        up = lora.get(f"{prefix}.lora_up.weight")
+        if up is None:
+            continue
+        down = lora[f"{prefix}.lora_down.weight"]
+        alpha = lora.get(f"{prefix}.alpha")
+        patch_dict[target] = ("lora", (up, down, None if alpha is None else alpha.item(), None, None, None))
+    return patch_dict
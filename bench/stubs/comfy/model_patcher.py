@@ -0,0 +1,36 @@
+# stand-in for comfy's ModelPatcher / CLIP: clone() + add_patches() bookkeeping only
+
+
+class _Weights:
+    def __init__(self, state_keys):
+        self.state_keys = state_keys
+
+
+class ModelPatcher:
+    def __init__(self, state_keys, patches=None):
+        self.model = _Weights(state_keys)
+        self.patches = dict(patches or {})
+
+    def clone(self):
+        return ModelPatcher(self.model.state_keys, {k: list(v) for k, v in self.patches.items()})
+
+    def add_patches(self, patches, strength_patch=1.0, strength_model=1.0):
+        added = []
+        keys = set(self.model.state_keys)
+        for k, v in patches.items():
+            if k in keys:
+                self.patches.setdefault(k, []).append((strength_patch, v, strength_model))
+                added.append(k)
+        return added
+
+
+class CLIP:
+    def __init__(self, state_keys, patcher=None):
+        self.cond_stage_model = _Weights(state_keys)
+        self.patcher = patcher or ModelPatcher(state_keys)
+
+    def clone(self):
+        return CLIP(self.cond_stage_model.state_keys, self.patcher.clone())
+
+    def add_patches(self, patches, strength_patch=1.0, strength_model=1.0):
+        return self.patcher.add_patches(patches, strength_patch, strength_model)
@@ -0,0 +1,34 @@
+# stand-in for comfy.utils.load_torch_file: .safetensors read fully into memory,
+# every tensor backed by that owned buffer (what the real loader costs, minus the lib)
+
+import json
+import struct
+
+import torch
+
+_DTYPES = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8,
+    "U8": torch.uint8, "BOOL": torch.bool,
+}
+
+
+def load_torch_file(ckpt, safe_load=False, device=None, return_metadata=False):
+    if not ckpt.lower().endswith((".safetensors", ".sft")):
+        sd = torch.load(ckpt, map_location="cpu", weights_only=True)
+        return (sd, None) if return_metadata else sd
+    with open(ckpt, "rb") as f:
+        (n,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(n))
+        data = bytearray(f.read())
+    meta = header.pop("__metadata__", None)
+    sd = {}
+    for name, info in header.items():
+        dtype = _DTYPES[info["dtype"]]
+        start, end = info["data_offsets"]
+        count = (end - start) // torch.empty((), dtype=dtype).element_size()
+        if count == 0:
+            sd[name] = torch.empty(info["shape"], dtype=dtype)
+        else:
+            sd[name] = torch.frombuffer(data, dtype=dtype, count=count, offset=start).view(info["shape"])
+    return (sd, meta) if return_metadata else sd
@@ -0,0 +1,40 @@
+# stand-in for ComfyUI's folder_paths, rooted at MNODES_BENCH_ROOT (set by bench/run.py)
+
+import os
+
+base_path = os.environ.get("MNODES_BENCH_ROOT") or os.path.join(os.getcwd(), "bench_root")
+models_dir = os.path.join(base_path, "models")
+
+supported_pt_extensions = {".ckpt", ".pt", ".pt2", ".bin", ".pth", ".safetensors", ".pkl", ".sft"}
+
+folder_names_and_paths = {
+    "loras": ([os.path.join(models_dir, "loras")], supported_pt_extensions),
+    "checkpoints": ([os.path.join(models_dir, "checkpoints")], supported_pt_extensions),
+}
+
+
+def get_folder_paths(folder_name):
+    return list(folder_names_and_paths[folder_name][0])
+
+
+def get_filename_list(folder_name):
+    paths, exts = folder_names_and_paths[folder_name]
+    out = set()
+    for root in paths:
+        for dirpath, dirnames, filenames in os.walk(root, followlinks=True):
+            dirnames[:] = [d for d in dirnames if d != ".git"]
+            for fn in filenames:
+                if not exts or os.path.splitext(fn)[-1].lower() in exts:
+                    out.add(os.path.relpath(os.path.join(dirpath, fn), root))
+    return sorted(out)
+
+
+def get_full_path(folder_name, filename):
+    if folder_name not in folder_names_and_paths:
+        return None
+    filename = os.path.relpath(os.path.join("/", filename), "/")
+    for root in folder_names_and_paths[folder_name][0]:
+        p = os.path.join(root, filename)
+        if os.path.isfile(p):
+            return p
+    return None
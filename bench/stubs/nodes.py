@@ -0,0 +1,3 @@
+# stand-in for ComfyUI's nodes module (mfold looks up node classes here)
+
+NODE_CLASS_MAPPINGS = {}
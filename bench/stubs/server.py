@@ -0,0 +1,27 @@
+# stand-in for ComfyUI's server module: just enough PromptServer for mroutes.py to register
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+
+class _Routes:
+    # used without aiohttp, the decorators only hand the handler back
+    def _deco(self, *args, **kw):
+        return lambda fn: fn
+
+    get = post = put = delete = _deco
+
+
+class _PromptServer:
+    def __init__(self):
+        self.routes = web.RouteTableDef() if web is not None else _Routes()
+        self.on_prompt_handlers = []
+
+    def add_on_prompt_handler(self, handler):
+        self.on_prompt_handlers.append(handler)
+
+
+class PromptServer:
+    instance = _PromptServer()
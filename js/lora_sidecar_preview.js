@@ -9,6 +9,80 @@ function pickField(meta, key) {
   return m ? m[1] : "";
 }
 
+// binary, downscaled thumb, browser revalidates it via ETag (304)
+const THUMB_SIZE = 512;
+function thumbUrl(name) {
+  return api.apiURL(`/mnodes/lora_thumb?name=${encodeURIComponent(name)}&size=${THUMB_SIZE}`);
+}
+
+// sidecar lookups: every fetchSidecar() in the same tick goes out as one batch POST,
+// names already in flight or fetched in the last SIDECAR_TTL_MS share that result
+const SIDECAR_TTL_MS = 2000;
+const SIDECAR_BATCH_MAX = 256;   // BATCH_MAX in mroutes.py, bigger queues go out in chunks
+const sidecarRecent = new Map(); // name -> { t, promise }, t = null while in flight
+let sidecarQueue = null;         // name -> { resolve, reject } for the next batch
+
+function flushSidecars() {
+  const entries = [...sidecarQueue];
+  sidecarQueue = null;
+  for (let i = 0; i < entries.length; i += SIDECAR_BATCH_MAX) {
+    fetchSidecarBatch(new Map(entries.slice(i, i + SIDECAR_BATCH_MAX)));
+  }
+}
+
+async function fetchSidecarBatch(q) {
+  try {
+    const r = await api.fetchApi("/mnodes/lora_sidecar_batch", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ names: [...q.keys()] }),
+    });
+    const j = await r.json();
+    for (const [name, p] of q) {
+      const item = j.items?.[name];
+      if (item && !item.error) p.resolve(item);
+      else p.reject(new Error(item?.error || j.error || "sidecar fetch failed"));
+    }
+  } catch (e) {
+    for (const p of q.values()) p.reject(e);
+  }
+}
+
+function fetchSidecar(name) {
+  const hit = sidecarRecent.get(name);
+  if (hit && (hit.t === null || Date.now() - hit.t < SIDECAR_TTL_MS)) return hit.promise;
+
+  const entry = { t: null, promise: null };
+  entry.promise = new Promise((resolve, reject) => {
+    if (!sidecarQueue) {
+      sidecarQueue = new Map();
+      setTimeout(flushSidecars, 0);
+    }
+    sidecarQueue.set(name, { resolve, reject });
+  }).then(
+    (item) => { entry.t = Date.now(); return item; },
+    (e) => { sidecarRecent.delete(name); throw e; },
+  );
+  sidecarRecent.set(name, entry);
+  return entry.promise;
+}
+
+// start reading the picked LoRA server side, so the queued job finds it in memory,
+// with the node's load_mode / fp16_cache (they're part of the server's cache key)
+function prefetchLora(node, name) {
+  if (!name || name === "None") return;
+  const body = { name };
+  const modeW = node.widgets?.find(w => w.name === "load_mode");
+  const fp16W = node.widgets?.find(w => w.name === "fp16_cache");
+  if (modeW) body.load_mode = modeW.value;
+  if (fp16W) body.fp16_cache = !!fp16W.value;
+  api.fetchApi("/mnodes/lora_prefetch", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  }).catch(() => {});
+}
+
 async function initNode(node) {
   if (node.__mn_inited) return;
   node.__mn_inited = true;
@@ -42,14 +116,13 @@ async function initNode(node) {
 
   async function refresh(value) {
     try {
-      const r = await api.fetchApi(`/mnodes/lora_sidecar?name=${encodeURIComponent(value)}`);
-      const j = await r.json();
+      const j = await fetchSidecar(value);
 
       const raw = j.meta || "";
       const trigger = pickField(raw, "trigger");
-      const trained = pickField(raw, "trainedWords");
-      const baseModel = pickField(raw, "baseModel");
-      const weight = pickField(raw, "recommendedWeight");
+      const trained = j.trainedWords ?? pickField(raw, "trainedWords");
+      const baseModel = j.baseModel ?? pickField(raw, "baseModel");
+      const weight = j.recommendedWeight ?? pickField(raw, "recommendedWeight");
 
       const header =
         `trigger:"${trigger}"\n` +
@@ -60,7 +133,7 @@ async function initNode(node) {
       metaW.value = header + raw;
 
       node.__mn_thumb_ready = false;
-      node.__mn_thumb_img.src = j.thumb_b64 ? `data:image/png;base64,${j.thumb_b64}` : "";
+      node.__mn_thumb_img.src = j.has_thumb ? thumbUrl(value) : "";
 
     } catch (e) {
       metaW.value = "(sidecar fetch failed)";
@@ -79,6 +152,7 @@ async function initNode(node) {
   const origCb = loraW.callback;
   loraW.callback = async (value) => {
     if (origCb) origCb.call(loraW, value);
+    prefetchLora(node, value);
     await refresh(value);
   };
 
@@ -86,6 +160,7 @@ async function initNode(node) {
   const origOnConfigure = node.onConfigure;
   node.onConfigure = function(info) {
     if (origOnConfigure) origOnConfigure.call(this, info);
+    // both land in the shared batch/dedupe, the second only costs a request if the value changed
     setTimeout(() => refresh(loraW.value), 0);
     setTimeout(() => refresh(loraW.value), 100);
   };
@@ -0,0 +1,103 @@
+# mcache.py
+# caches shared by the mnodes modules (no torch/numpy here)
+
+import os
+import threading
+from collections import OrderedDict
+
+
+def env_mb(name: str, default_mb: int) -> int:
+    # budget knobs come from env, in MB, "0" disables the cache
+    try:
+        return max(0, int(float(os.environ.get(name, default_mb)) * 1024 * 1024))
+    except ValueError:
+        return default_mb * 1024 * 1024
+
+
+def stat_sig(st):
+    # size + mtime, plus ctime + inode: tools that rewrite a file in place and put the
+    # old mtime back (rsync -t, some sync clients) still bump ctime, a replace changes the inode
+    return (st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+
+
+def file_key(path: str):
+    # (path, size, mtime_ns, ctime_ns, ino) -> changes whenever the file is replaced/edited
+    return (os.path.abspath(path), *stat_sig(os.stat(path)))
+
+
+# on-disk caches (thumb derivatives, sqlite index, ...) live here
+CACHE_DIR = os.environ.get("MNODES_CACHE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+
+class ByteLRU:
+    """
+    Thread-safe LRU keyed by anything hashable, evicting by total byte size.
+
+    sizeof(value) -> int is called once on put(). Values bigger than the whole
+    budget are not stored at all (caller still gets to use them).
+    """
+
+    def __init__(self, budget_bytes: int, sizeof=None):
+        self.budget = int(budget_bytes)
+        self.sizeof = sizeof or (lambda v: 1)
+        self._d = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            hit = self._d.get(key)
+            if hit is None:
+                self.misses += 1
+                return default
+            self._d.move_to_end(key)
+            self.hits += 1
+            return hit[0]
+
+    def put(self, key, value):
+        n = int(self.sizeof(value))
+        with self._lock:
+            old = self._d.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if n > self.budget:
+                return value
+            self._d[key] = (value, n)
+            self.bytes += n
+            while self.bytes > self.budget and self._d:
+                _, (_, nb) = self._d.popitem(last=False)
+                self.bytes -= nb
+                self.evictions += 1
+        return value
+
+    def drop(self, pred):
+        # remove every key for which pred(key) is true (e.g. stale versions of a path)
+        with self._lock:
+            for k in [k for k in self._d if pred(k)]:
+                self.bytes -= self._d.pop(k)[1]
+
+    def clear(self):
+        with self._lock:
+            self._d.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._d)
+
+    def __contains__(self, key):
+        return key in self._d
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._d),
+            "bytes": self.bytes,
+            "budget": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
@@ -0,0 +1,169 @@
+# mfold.py
+# Constant folding of pure mnodes before a prompt is executed.
+#
+# Node classes with PURE = True are plain functions of their inputs. When every
+# input of such a node is a literal (or comes from another foldable node), we run
+# it right here, write its outputs as literals into the consumers and drop it
+# from the prompt. The executor never schedules it.
+#
+# A literal is only written into a consumer input that would accept it as a widget
+# value (same type, within min/max, in the combo list), otherwise the link and
+# its producer stay. The same check guards a pure node's own widget values before
+# it's called, validation hasn't run yet at this point.
+#
+# on_prompt is called synchronously from the /prompt handler, so the folding runs on
+# a copy of the prompt in a worker thread and gets MNODES_FOLD_TIMEOUT_MS (default 50)
+# to finish, the prompt goes out unfolded otherwise. MNODES_FOLD=0 turns this off.
+
+import copy
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from . import mmetrics
+
+ENABLED = os.environ.get("MNODES_FOLD", "1") != "0"
+TIMEOUT_S = float(os.environ.get("MNODES_FOLD_TIMEOUT_MS", "50")) / 1000
+
+_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mnodes-fold")
+_pending = None  # last fold job, a new one isn't queued behind one that's still running
+
+# totals since startup
+FOLD_STATS = {"prompts": 0, "folded": 0}
+mmetrics.register_stats("fold", FOLD_STATS)
+
+
+def _is_link(v, prompt):
+    return isinstance(v, list) and len(v) == 2 and isinstance(v[1], int) and str(v[0]) in prompt
+
+
+def _input_spec(cls, name, spec_cache):
+    if cls not in spec_cache:
+        try:
+            types = cls.INPUT_TYPES()
+        except Exception:
+            types = {}
+        spec_cache[cls] = {**types.get("optional", {}), **types.get("required", {})}
+    return spec_cache[cls].get(name)
+
+
+def _accepts(spec, v) -> bool:
+    # would the executor take v as a literal for this input and pass it through unchanged?
+    if not spec:
+        return False
+    t = spec[0]
+    opts = spec[1] if len(spec) > 1 and isinstance(spec[1], dict) else {}
+    if isinstance(t, (list, tuple)):
+        return v in t
+    if t == "INT":
+        ok = type(v) is int
+    elif t == "FLOAT":
+        ok = type(v) is float
+    elif t == "STRING":
+        ok = isinstance(v, str)
+    elif t == "BOOLEAN":
+        ok = isinstance(v, bool)
+    else:
+        return False
+    if ok and t in ("INT", "FLOAT"):
+        if "min" in opts and v < opts["min"]:
+            return False
+        if "max" in opts and v > opts["max"]:
+            return False
+    return ok
+
+
+def fold_prompt(prompt: dict, class_mappings: dict, deadline: float = None) -> int:
+    """Fold pure constant nodes of an API-format prompt in place, returns #nodes removed.
+
+    deadline (time.perf_counter()) stops evaluating nodes once it's passed."""
+    results = {}  # node id -> output tuple, None = not foldable
+    spec_cache = {}
+
+    def is_pure(nid):
+        cls = class_mappings.get(prompt[nid].get("class_type"))
+        return cls is not None and getattr(cls, "PURE", False) and not getattr(cls, "INPUT_IS_LIST", False)
+
+    def evaluate(nid):
+        if nid in results:
+            return results[nid]
+        results[nid] = None  # also what a cycle back to nid sees
+        if not is_pure(nid) or (deadline is not None and time.perf_counter() > deadline):
+            return None
+        cls = class_mappings[prompt[nid]["class_type"]]
+        args = {}
+        for name, v in prompt[nid].get("inputs", {}).items():
+            if _is_link(v, prompt):
+                src = evaluate(str(v[0]))
+                if src is None or v[1] >= len(src):
+                    return None
+                v = src[v[1]]
+            elif not _accepts(_input_spec(cls, name, spec_cache), v):
+                return None  # validation would reject it (or coerce it), leave it to the executor
+            args[name] = v
+
+        try:
+            obj = cls()
+            fn = getattr(obj, cls.FUNCTION)
+            if getattr(fn, "_mnodes_metrics", False):
+                fn = fn.__wrapped__.__get__(obj)  # not an execution, keep it out of mnodes_node_seconds
+            out = fn(**args)
+        except Exception:
+            return None  # let the executor run it and report the error
+        if isinstance(out, tuple):
+            results[nid] = out
+        return results[nid]
+
+    for nid in list(prompt):
+        evaluate(nid)
+
+    for nid, node in prompt.items():
+        cls = class_mappings.get(node.get("class_type"))
+        for name, v in list(node.get("inputs", {}).items()):
+            if not _is_link(v, prompt):
+                continue
+            src = results.get(str(v[0]))
+            if src is None or v[1] >= len(src):
+                continue
+            if cls is not None and _accepts(_input_spec(cls, name, spec_cache), src[v[1]]):
+                node["inputs"][name] = src[v[1]]
+
+    still_linked = {str(v[0]) for node in prompt.values()
+                    for v in node.get("inputs", {}).values() if _is_link(v, prompt)}
+    removed = [nid for nid, out in results.items() if out is not None and nid not in still_linked]
+    for nid in removed:
+        del prompt[nid]
+    return len(removed)
+
+
+def _fold(prompt, class_mappings):
+    n = fold_prompt(prompt, class_mappings, deadline=time.perf_counter() + TIMEOUT_S)
+    return prompt, n
+
+
+def on_prompt(json_data):
+    # PromptServer on_prompt handler, runs on the event loop before validation
+    global _pending
+    if not ENABLED or not isinstance(json_data.get("prompt"), dict):
+        return json_data
+    if _pending is not None and not _pending.done():
+        logging.warning("[mnodes] previous constant folding still running, prompt left as is")
+        return json_data
+    import nodes
+    # a copy, the thread may still be at it when the prompt has moved on
+    _pending = _POOL.submit(_fold, copy.deepcopy(json_data["prompt"]), nodes.NODE_CLASS_MAPPINGS)
+    try:
+        prompt, n = _pending.result(timeout=TIMEOUT_S)
+    except TimeoutError:
+        logging.warning(f"[mnodes] constant folding took over {TIMEOUT_S * 1000:.0f} ms, prompt left as is")
+        return json_data
+    except Exception:
+        logging.exception("[mnodes] constant folding failed, prompt left as is")
+        return json_data
+    json_data["prompt"] = prompt
+    FOLD_STATS["prompts"] += 1
+    FOLD_STATS["folded"] += n
+    if n:
+        logging.info(f"[mnodes] constant-folded {n} node(s)")
+    return json_data
@@ -0,0 +1,200 @@
+# mhash.py
+# SHA256 / BLAKE3 / Civitai AutoV2 hashes of model files, one read per file,
+# remembered in sqlite by (path, size, mtime_ns, ctime_ns, ino) so only new or changed
+# files get hashed. ctime + inode catch rewrites that put the old mtime back.
+#
+# Also a CLI (no ComfyUI needed, keep this file free of package imports):
+#   python mhash.py [--db PATH] [--workers N] [--fields sha256,autov2] [--json] <files or dirs>...
+#
+# BLAKE3 is filled in when the `blake3` package is installed, else left "".
+# AutoV2 is Civitai's short hash: the first 10 hex chars of SHA256, uppercase.
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+try:
+    import blake3 as _blake3
+except ImportError:
+    _blake3 = None
+
+# same default as mcache.CACHE_DIR
+CACHE_DIR = os.environ.get("MNODES_CACHE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+DB_PATH = os.path.join(CACHE_DIR, "hashes.sqlite")
+
+MODEL_EXTS = (".safetensors", ".ckpt", ".pt", ".pth", ".bin")
+FIELDS = ("sha256", "autov2", "blake3")
+
+_CHUNK = 8 * 1024 * 1024
+
+# bump when the hashes table changes, older cache files are emptied
+SCHEMA_VERSION = 2
+
+
+def stat_sig(st):
+    # same as mcache.stat_sig, this file stays free of package imports
+    return (st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+
+
+def hash_file(path: str) -> dict:
+    """One sequential read, every hasher fed from the same buffer."""
+    sha = hashlib.sha256()
+    b3 = _blake3.blake3() if _blake3 is not None else None
+    buf = bytearray(_CHUNK)
+    mv = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            sha.update(mv[:n])  # releases the GIL, threads hash in parallel too
+            if b3 is not None:
+                b3.update(mv[:n])
+    h = sha.hexdigest()
+    return {"sha256": h, "autov2": h[:10].upper(), "blake3": b3.hexdigest() if b3 is not None else ""}
+
+
+def _hash_job(path: str):
+    sig = stat_sig(os.stat(path))  # before reading: a file changing mid-hash gets hashed again next time
+    return path, sig, hash_file(path)
+
+
+class HashCache:
+    def __init__(self, db_path: str = DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # rows without ctime / inode can't be trusted, a same-size rewrite with the old mtime passes them
+            self._db.execute("DROP TABLE IF EXISTS hashes")
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS hashes (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER,"
+            " ctime_ns INTEGER, ino INTEGER, sha256 TEXT, autov2 TEXT, blake3 TEXT)")
+        self._lock = threading.Lock()
+
+    def get(self, path: str, sig: tuple):
+        # sig: stat_sig() of the file now
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sha256, autov2, blake3 FROM hashes"
+                " WHERE path = ? AND size = ? AND mtime_ns = ? AND ctime_ns = ? AND ino = ?",
+                (path, *sig)).fetchone()
+        if row is None:
+            return None
+        rec = dict(zip(FIELDS, row))
+        if _blake3 is not None and not rec["blake3"]:
+            return None  # blake3 got installed since, fill it in
+        return rec
+
+    def put(self, path: str, sig: tuple, rec: dict):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO hashes (path, size, mtime_ns, ctime_ns, ino, sha256, autov2, blake3)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, *sig, rec["sha256"], rec["autov2"], rec["blake3"]))
+            self._db.commit()
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_cache(db_path: str = DB_PATH) -> HashCache:
+    with _CACHES_LOCK:
+        if db_path not in _CACHES:
+            _CACHES[db_path] = HashCache(db_path)
+        return _CACHES[db_path]
+
+
+def hash_files(paths, db_path: str = DB_PATH, workers: int = 0, processes: bool = True, on_done=None) -> dict:
+    """
+    abspath -> {"sha256", "autov2", "blake3"} for every readable file in paths.
+    Cached files cost one stat, the rest are hashed across a process (or thread) pool.
+    """
+    cache = get_cache(db_path)
+    out, todo = {}, []
+    for p in dict.fromkeys(os.path.abspath(p) for p in paths):
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        rec = cache.get(p, stat_sig(st))
+        if rec is None:
+            todo.append(p)
+        else:
+            out[p] = rec
+    if not todo:
+        return out
+
+    workers = workers or min(8, os.cpu_count() or 1, len(todo))
+    pool_cls = ProcessPoolExecutor if processes and len(todo) > 1 else ThreadPoolExecutor
+    with pool_cls(max_workers=workers) as pool:
+        futs = [pool.submit(_hash_job, p) for p in todo]
+        for fut in as_completed(futs):
+            try:
+                p, sig, rec = fut.result()
+            except OSError:
+                continue
+            cache.put(p, sig, rec)
+            out[p] = rec
+            if on_done is not None:
+                on_done(p, rec)
+    return out
+
+
+def file_hashes(path: str, db_path: str = DB_PATH) -> dict:
+    # single file, in the calling thread
+    return hash_files([path], db_path=db_path, processes=False).get(os.path.abspath(path))
+
+
+def _expand(args):
+    for a in args:
+        if os.path.isdir(a):
+            for root, _, files in os.walk(a):
+                for fn in sorted(files):
+                    if fn.lower().endswith(MODEL_EXTS):
+                        yield os.path.join(root, fn)
+        else:
+            yield a
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="hash model files (sha256, autov2, blake3) with a persistent cache")
+    ap.add_argument("paths", nargs="+", help="files, or dirs to scan for model files")
+    ap.add_argument("--db", default=DB_PATH, help=f"hash cache (default {DB_PATH})")
+    ap.add_argument("--workers", type=int, default=0, help="parallel hashers (default min(8, cpus))")
+    ap.add_argument("--fields", default="sha256,autov2,blake3",
+                    help="comma list printed per file as <f1>\\t<f2>...\\t<path>")
+    ap.add_argument("--json", action="store_true", help="print one json object instead")
+    args = ap.parse_args(argv)
+
+    fields = [f for f in args.fields.split(",") if f]
+    bad = [f for f in fields if f not in FIELDS]
+    if bad:
+        ap.error(f"unknown field(s): {', '.join(bad)}")
+
+    paths = list(_expand(args.paths))
+    res = hash_files(paths, db_path=args.db, workers=args.workers)
+    missing = [p for p in paths if os.path.abspath(p) not in res]
+    for p in missing:
+        print(f"cannot read: {p}", file=sys.stderr)
+
+    if args.json:
+        json.dump({p: res[os.path.abspath(p)] for p in paths if os.path.abspath(p) in res}, sys.stdout, indent=1)
+        print()
+    else:
+        for p in paths:
+            rec = res.get(os.path.abspath(p))
+            if rec is not None:
+                print("\t".join([rec[f] for f in fields] + [p]))
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
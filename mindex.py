@@ -0,0 +1,170 @@
+# mindex.py
+# Persistent sqlite index of LoRA sidecar metadata (<lora>.txt written by util/civs.sh).
+#
+# Each sidecar is parsed once, rows remember the (size, mtime_ns) of the .txt and the
+# .png and a rescan only re-parses rows where either stat changed (a .png dropped in
+# next to an untouched .txt flips has_thumb). Queries never touch the loras folder.
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from .mcache import CACHE_DIR
+from .msidecar import parse_sidecar
+
+DB_PATH = os.path.join(CACHE_DIR, "lora_index.sqlite")
+
+# a query rescans at most this often (stat of every .txt), 0 = every query
+RESCAN_INTERVAL_S = 10.0
+
+# bump when _SCHEMA changes, older index files are rebuilt from scratch (it's only a cache)
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS loras (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    txt_size INTEGER,
+    txt_mtime_ns INTEGER,
+    png_size INTEGER,
+    png_mtime_ns INTEGER,
+    has_thumb INTEGER NOT NULL DEFAULT 0,
+    model_name TEXT NOT NULL DEFAULT '',
+    base_model TEXT NOT NULL DEFAULT '',
+    trained_words TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '',
+    recommended_weight REAL,
+    sha256 TEXT NOT NULL DEFAULT '',
+    autov2 TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS loras_base_model ON loras(base_model COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS lora_words (name TEXT NOT NULL, word TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS lora_words_word ON lora_words(word);
+CREATE INDEX IF NOT EXISTS lora_words_name ON lora_words(name);
+CREATE TABLE IF NOT EXISTS lora_tags (name TEXT NOT NULL, tag TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS lora_tags_tag ON lora_tags(tag);
+CREATE INDEX IF NOT EXISTS lora_tags_name ON lora_tags(name);
+"""
+
+
+def _stat_sig(path: str):
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    except OSError:
+        return None, None
+
+
+def _split_list(s: str):
+    return sorted({w.strip().lower() for w in s.split(",") if w.strip()})
+
+
+class LoraIndex:
+    def __init__(self, db_path: str = DB_PATH):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._db.executescript("DROP TABLE IF EXISTS loras; DROP TABLE IF EXISTS lora_words;"
+                                   " DROP TABLE IF EXISTS lora_tags;")
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._last_scan = 0.0
+
+    def refresh(self, entries, force: bool = False) -> int:
+        """
+        entries: iterable of (name, full lora path). Re-parses sidecars whose
+        .txt or .png stat changed, drops rows for loras that are gone. Returns #parsed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_scan < RESCAN_INTERVAL_S:
+                return 0
+
+            known = {n: tuple(r) for n, *r in self._db.execute(
+                "SELECT name, path, txt_size, txt_mtime_ns, png_size, png_mtime_ns FROM loras")}
+            seen = set()
+            parsed = 0
+            for name, lora_path in entries:
+                seen.add(name)
+                base = os.path.splitext(lora_path)[0]
+                sig = (*_stat_sig(base + ".txt"), *_stat_sig(base + ".png"))
+                old = known.get(name)
+                if old is not None and old == (lora_path, *sig):
+                    continue
+                sc = parse_sidecar(base + ".txt") if sig[0] is not None else None
+                self._upsert(name, lora_path, sig, sc)
+                parsed += 1
+
+            gone = [(n,) for n in known if n not in seen]
+            if gone:
+                for table in ("loras", "lora_words", "lora_tags"):
+                    self._db.executemany(f"DELETE FROM {table} WHERE name = ?", gone)
+            self._db.commit()
+            self._last_scan = time.monotonic()
+            return parsed
+
+    def _upsert(self, name, lora_path, sig, sc):
+        # sig: (txt size, txt mtime_ns, png size, png mtime_ns), None for a missing file
+        fields = sc.fields if sc is not None else {}
+        db = self._db
+        db.execute(
+            "INSERT OR REPLACE INTO loras (name, path, txt_size, txt_mtime_ns, png_size, png_mtime_ns,"
+            " has_thumb, model_name, base_model, trained_words, tags, recommended_weight, sha256, autov2)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (name, lora_path, *sig, int(sig[2] is not None),
+             fields.get("modelName", ""), fields.get("baseModel", ""),
+             fields.get("trainedWords", ""), fields.get("tags", ""),
+             sc.recommended_weight if sc is not None else None,
+             fields.get("hashSHA256", "").lower(), fields.get("hashAutoV2", "").lower()))
+        db.execute("DELETE FROM lora_words WHERE name = ?", (name,))
+        db.execute("DELETE FROM lora_tags WHERE name = ?", (name,))
+        words = set(_split_list(fields.get("trainedWords", "")) + _split_list(fields.get("trigger", "")))
+        db.executemany("INSERT INTO lora_words (name, word) VALUES (?, ?)", [(name, w) for w in words])
+        db.executemany("INSERT INTO lora_tags (name, tag) VALUES (?, ?)",
+                       [(name, t) for t in _split_list(fields.get("tags", ""))])
+
+    def query(self, base_model="", word="", tag="", prefix="", offset=0, limit=50) -> dict:
+        where, args = [], []
+        if base_model:
+            where.append("base_model = ? COLLATE NOCASE")
+            args.append(base_model)
+        if word:
+            where.append("name IN (SELECT name FROM lora_words WHERE word = ?)")
+            args.append(word.strip().lower())
+        if tag:
+            where.append("name IN (SELECT name FROM lora_tags WHERE tag = ?)")
+            args.append(tag.strip().lower())
+        if prefix:
+            where.append("name LIKE ? ESCAPE '\\'")
+            args.append(re.sub(r"([\\%_])", r"\\\1", prefix) + "%")
+        sql_where = (" WHERE " + " AND ".join(where)) if where else ""
+
+        with self._lock:
+            total = self._db.execute(f"SELECT COUNT(*) FROM loras{sql_where}", args).fetchone()[0]
+            rows = self._db.execute(
+                "SELECT name, model_name, base_model, trained_words, tags, recommended_weight,"
+                f" sha256, autov2, has_thumb FROM loras{sql_where} ORDER BY name LIMIT ? OFFSET ?",
+                (*args, int(limit), int(offset))).fetchall()
+
+        cols = ("name", "modelName", "baseModel", "trainedWords", "tags", "recommendedWeight",
+                "hashSHA256", "hashAutoV2", "has_thumb")
+        items = [dict(zip(cols, r)) for r in rows]
+        for it in items:
+            it["has_thumb"] = bool(it["has_thumb"])
+        return {"total": total, "offset": int(offset), "limit": int(limit), "items": items}
+
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_index() -> LoraIndex:
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = LoraIndex()
+        return _INDEX
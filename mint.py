@@ -2,7 +2,9 @@
 # custom_nodes/mnodes/mint.py
 # "mint" = "M int" nodes, integer math toolkit for ComfyUI.
 
+import ast
 import math
+from functools import lru_cache
 
 I32_MIN = -(2**31)
 I32_MAX =  (2**31 - 1)
@@ -25,6 +27,20 @@ def _lcm(a: int, b: int) -> int:
         return 0
     return abs(a // math.gcd(a, b) * b)
 
+def _pow_capped(a: int, b: int) -> int:
+    # Keep it sane, huge exponents will explode time/size.
+    b = max(min(int(b), 62), -62)
+    if b < 0:
+        return 0  # integer pow with negative exponent -> 0 (you can change this)
+    return int(pow(a, b))
+
+def _sign(x: int) -> int:
+    return 0 if x == 0 else (1 if x > 0 else -1)
+
+def _clamp(x: int, lo: int, hi: int) -> int:
+    if lo > hi: lo, hi = hi, lo
+    return lo if x < lo else hi if x > hi else x
+
 # ------------------------
 # Binary ops
 # ------------------------
@@ -101,12 +117,7 @@ class IntPow:
     RETURN_NAMES = ("a_pow_b",)
     FUNCTION = "go"
     CATEGORY = "mnodes/int"
-    def go(self, a, b):
-        # Keep it sane, huge exponents will explode time/size.
-        b = max(min(int(b), 62), -62)
-        if b < 0:
-            return (0,)  # integer pow with negative exponent -> 0 (you can change this)
-        return (int(pow(a, b)),)
+    def go(self, a, b): return (_pow_capped(a, b),)
 
 class IntMin:
     @classmethod
@@ -136,9 +147,7 @@ class IntClamp:
     RETURN_NAMES = ("clamped",)
     FUNCTION = "go"
     CATEGORY = "mnodes/int"
-    def go(self, x, lo, hi):
-        if lo > hi: lo, hi = hi, lo
-        return (lo if x < lo else hi if x > hi else x,)
+    def go(self, x, lo, hi): return (_clamp(x, lo, hi),)
 
 # ------------------------
 # Unary ops
@@ -172,8 +181,7 @@ class IntSign:
     RETURN_NAMES = ("sign",)
     FUNCTION = "go"
     CATEGORY = "mnodes/int"
-    def go(self, x):
-        return (0 if x == 0 else (1 if x > 0 else -1),)
+    def go(self, x): return (_sign(x),)
 
 # ------------------------
 # Number theory-ish
@@ -233,6 +241,141 @@ class IntLe:
     CATEGORY = "mnodes/int"
     def go(self, a, b): return (1 if a <= b else 0,)
 
+# ------------------------
+# Expression (one node instead of a chain)
+# ------------------------
+# clamp((a // 8) * 8 + b, 64, 4096) over inputs a..f, same semantics as the nodes above:
+#   + - *   // and / (both floor, x/0 -> 0)   % (x%0 -> 0)   ** (exponent capped like IntPow)
+#   == != < <= > >= not and or -> 0/1,  x if cond else y
+#   min(...) max(...) clamp(x,lo,hi) abs sign gcd lcm
+# Parsed once per expression text into nested closures, no eval().
+# + - * ** results past EXPR_MAX_BITS raise, so nested powers can't grow without bound.
+
+EXPR_NAMES = ("a", "b", "c", "d", "e", "f")
+EXPR_MAX_LEN = 4096
+EXPR_MAX_BITS = 64
+
+def _bounded(x: int) -> int:
+    if x.bit_length() > EXPR_MAX_BITS:
+        raise ValueError(f"result doesn't fit in {EXPR_MAX_BITS} bits")
+    return x
+
+def _expr_pow(x: int, y: int) -> int:
+    # |x| >= 2**(bits-1), so the result has at least (bits-1)*y bits: check before computing it
+    if y > 1 and (x.bit_length() - 1) * min(y, 62) > EXPR_MAX_BITS:
+        raise ValueError(f"result doesn't fit in {EXPR_MAX_BITS} bits")
+    return _bounded(_pow_capped(x, y))
+
+_EXPR_BINOPS = {
+    ast.Add: lambda x, y: _bounded(x + y),
+    ast.Sub: lambda x, y: _bounded(x - y),
+    ast.Mult: lambda x, y: _bounded(x * y),
+    ast.FloorDiv: _safe_div,
+    ast.Div: _safe_div,
+    ast.Mod: _safe_mod,
+    ast.Pow: _expr_pow,
+}
+
+_EXPR_CMPS = {
+    ast.Eq: lambda x, y: x == y,
+    ast.NotEq: lambda x, y: x != y,
+    ast.Lt: lambda x, y: x < y,
+    ast.LtE: lambda x, y: x <= y,
+    ast.Gt: lambda x, y: x > y,
+    ast.GtE: lambda x, y: x >= y,
+}
+
+# name -> (fn, min args, max args)
+_EXPR_FUNCS = {
+    "min": (min, 1, None),
+    "max": (max, 1, None),
+    "clamp": (_clamp, 3, 3),
+    "abs": (abs, 1, 1),
+    "sign": (_sign, 1, 1),
+    "gcd": (math.gcd, 2, 2),
+    "lcm": (_lcm, 2, 2),
+}
+
+def _expr_node(node):
+    # returns fn(env) -> int
+    if isinstance(node, ast.Constant) and type(node.value) in (int, bool):
+        v = int(node.value)
+        return lambda env: v
+    if isinstance(node, ast.Name):
+        if node.id not in EXPR_NAMES:
+            raise ValueError(f"unknown name '{node.id}', inputs are {', '.join(EXPR_NAMES)}")
+        k = node.id
+        return lambda env: env[k]
+    if isinstance(node, ast.BinOp) and type(node.op) in _EXPR_BINOPS:
+        op, l, r = _EXPR_BINOPS[type(node.op)], _expr_node(node.left), _expr_node(node.right)
+        return lambda env: op(l(env), r(env))
+    if isinstance(node, ast.UnaryOp):
+        x = _expr_node(node.operand)
+        if isinstance(node.op, ast.USub):
+            return lambda env: -x(env)
+        if isinstance(node.op, ast.UAdd):
+            return x
+        if isinstance(node.op, ast.Not):
+            return lambda env: 0 if x(env) else 1
+    if isinstance(node, ast.Compare) and all(type(o) in _EXPR_CMPS for o in node.ops):
+        first = _expr_node(node.left)
+        rest = [(_EXPR_CMPS[type(o)], _expr_node(c)) for o, c in zip(node.ops, node.comparators)]
+        def cmp(env):
+            x = first(env)
+            for op, f in rest:
+                y = f(env)
+                if not op(x, y):
+                    return 0
+                x = y
+            return 1
+        return cmp
+    if isinstance(node, ast.BoolOp):
+        parts = [_expr_node(v) for v in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda env: 1 if all(p(env) for p in parts) else 0
+        return lambda env: 1 if any(p(env) for p in parts) else 0
+    if isinstance(node, ast.IfExp):
+        t, c, e = _expr_node(node.test), _expr_node(node.body), _expr_node(node.orelse)
+        return lambda env: c(env) if t(env) else e(env)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        spec = _EXPR_FUNCS.get(node.func.id)
+        if spec is None:
+            raise ValueError(f"unknown function '{node.func.id}'")
+        fn, lo, hi = spec
+        n = len(node.args)
+        if n < lo or (hi is not None and n > hi):
+            raise ValueError(f"{node.func.id}() takes {lo if lo == hi else f'{lo}+'} argument(s), got {n}")
+        args = [_expr_node(a) for a in node.args]
+        if n == 1 and fn in (min, max):
+            return args[0]
+        return lambda env: fn(*[a(env) for a in args])
+    raise ValueError(f"unsupported syntax: {ast.dump(node)[:80]}")
+
+@lru_cache(maxsize=256)
+def compile_int_expr(src: str):
+    if len(src) > EXPR_MAX_LEN:
+        raise ValueError(f"expression longer than {EXPR_MAX_LEN} chars")
+    try:
+        tree = ast.parse(src.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"bad expression: {e.msg}") from None
+    return _expr_node(tree.body)
+
+class IntExpr:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {"expr": ("STRING", {"default": "clamp((a // 8) * 8 + b, 64, 4096)", "multiline": False})},
+            "optional": {k: _int_socket(0) for k in EXPR_NAMES},
+        }
+    RETURN_TYPES = ("INT",)
+    RETURN_NAMES = ("result",)
+    FUNCTION = "go"
+    CATEGORY = "mnodes/int"
+    def go(self, expr, **kw):
+        env = {k: int(kw.get(k, 0)) for k in EXPR_NAMES}
+        return (int(compile_int_expr(expr)(env)),)
+
 # ------------------------
 # ComfyUI discovery maps
 # ------------------------
@@ -256,8 +399,13 @@ NODE_CLASS_MAPPINGS = {
     "MIntEq": IntEq,
     "MIntLt": IntLt,
     "MIntLe": IntLe,
+    "MIntExpr": IntExpr,
 }
 
+# every node above is a pure function of its inputs (see mfold.py)
+for _cls in NODE_CLASS_MAPPINGS.values():
+    _cls.PURE = True
+
 NODE_DISPLAY_NAME_MAPPINGS = {
     "MIntAdd": "M Int Add (a + b)",
     "MIntSub": "M Int Sub (a - b)",
@@ -277,5 +425,6 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "MIntEq": "M Int Eq (a==b)",
     "MIntLt": "M Int Lt (a<b)",
     "MIntLe": "M Int Le (a<=b)",
+    "MIntExpr": "M Int Expr (a..f)",
 }
 
@@ -0,0 +1,178 @@
+# custom_nodes/mnodes/mintv.py
+# "mint vector": list versions of the mint.py ops, one execution per sweep.
+#
+# Inputs are INT lists (INPUT_IS_LIST), shorter lists are padded with their last
+# value, same as ComfyUI does when it maps a scalar node over lists. Results are
+# exactly what the scalar mint nodes give per element: x//0 and x%0 -> 0, pow
+# exponent capped to 62 (negative -> 0). NumPy int64 does the work while every
+# input fits in int32, anything bigger falls back to the scalar helpers.
+
+import math
+
+from .mint import I32_MIN, I32_MAX, _int_socket, _safe_div, _safe_mod, _lcm, _pow_capped, _sign
+
+BINARY_OPS = ("add", "sub", "mul", "div_floor", "mod", "pow", "min", "max", "gcd", "lcm")
+UNARY_OPS = ("abs", "neg", "sign")
+COMPARE_OPS = ("eq", "lt", "le")
+
+_SCALAR = {
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "mul": lambda a, b: a * b,
+    "div_floor": _safe_div,
+    "mod": _safe_mod,
+    "pow": _pow_capped,
+    "min": lambda a, b: a if a < b else b,
+    "max": lambda a, b: a if a > b else b,
+    "gcd": lambda a, b: math.gcd(a, b),
+    "lcm": _lcm,
+    "abs": abs,
+    "neg": lambda x: -x,
+    "sign": _sign,
+    "eq": lambda a, b: 1 if a == b else 0,
+    "lt": lambda a, b: 1 if a < b else 0,
+    "le": lambda a, b: 1 if a <= b else 0,
+}
+
+
+def _pad(lists):
+    # -> equal length python int lists, or None if any input is empty
+    n = max(len(v) for v in lists)
+    out = []
+    for v in lists:
+        if not v:
+            return None
+        v = [int(x) for x in v]
+        out.append(v + [v[-1]] * (n - len(v)))
+    return out
+
+
+def _as_i32_arrays(lists):
+    # int64 arrays if every value is in int32 range (then + - * // % gcd lcm can't overflow)
+    import numpy as np
+    arrs = []
+    for v in lists:
+        if min(v) < I32_MIN or max(v) > I32_MAX:
+            return None
+        arrs.append(np.asarray(v, dtype=np.int64))
+    return arrs
+
+
+def _pow_np(a, b):
+    import numpy as np
+    e = np.clip(b, 0, 62)
+    mag = np.abs(a)
+    # 2^62.5 < int64 max, so anything under that bound is exact in int64
+    safe = (mag <= 1) | (e * np.log2(np.maximum(mag, 1)) < 62.5)
+    res = np.where(safe, a, 0) ** np.where(safe, e, 0)
+    res = np.where(b < 0, 0, res).tolist()
+    for i in np.flatnonzero(~safe & (b >= 0)):
+        res[i] = _pow_capped(int(a[i]), int(b[i]))
+    return res
+
+
+def _binary_np(op, a, b):
+    import numpy as np
+    if op == "add":
+        return (a + b).tolist()
+    if op == "sub":
+        return (a - b).tolist()
+    if op == "mul":
+        return (a * b).tolist()
+    if op in ("div_floor", "mod"):
+        zero = b == 0
+        bb = np.where(zero, 1, b)
+        r = a // bb if op == "div_floor" else a % bb
+        return np.where(zero, 0, r).tolist()
+    if op == "pow":
+        return _pow_np(a, b)
+    if op == "min":
+        return np.minimum(a, b).tolist()
+    if op == "max":
+        return np.maximum(a, b).tolist()
+    if op == "gcd":
+        return np.gcd(a, b).tolist()
+    if op == "lcm":
+        return np.lcm(a, b).tolist()
+    if op == "eq":
+        return (a == b).astype(np.int64).tolist()
+    if op == "lt":
+        return (a < b).astype(np.int64).tolist()
+    if op == "le":
+        return (a <= b).astype(np.int64).tolist()
+    raise ValueError(f"unknown op: {op}")
+
+
+def _unary_np(op, x):
+    import numpy as np
+    if op == "abs":
+        return np.abs(x).tolist()
+    if op == "neg":
+        return (-x).tolist()
+    if op == "sign":
+        return np.sign(x).tolist()
+    raise ValueError(f"unknown op: {op}")
+
+
+def int_list_op(op: str, *lists) -> list:
+    """Apply scalar mint op elementwise over INT lists (padded to the longest)."""
+    if op not in _SCALAR:
+        raise ValueError(f"unknown op: {op}")
+    padded = _pad(lists)
+    if padded is None:
+        return []
+    arrs = _as_i32_arrays(padded)
+    if arrs is None:
+        fn = _SCALAR[op]
+        return [fn(*args) for args in zip(*padded)]
+    return _unary_np(op, *arrs) if len(arrs) == 1 else _binary_np(op, *arrs)
+
+
+class IntListBinary:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {"op": (list(BINARY_OPS),), "a": _int_socket(0), "b": _int_socket(0)}}
+    INPUT_IS_LIST = True
+    RETURN_TYPES = ("INT",)
+    RETURN_NAMES = ("out",)
+    OUTPUT_IS_LIST = (True,)
+    FUNCTION = "go"
+    CATEGORY = "mnodes/int/list"
+    def go(self, op, a, b): return (int_list_op(op[0], a, b),)
+
+class IntListUnary:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {"op": (list(UNARY_OPS),), "x": _int_socket(0)}}
+    INPUT_IS_LIST = True
+    RETURN_TYPES = ("INT",)
+    RETURN_NAMES = ("out",)
+    OUTPUT_IS_LIST = (True,)
+    FUNCTION = "go"
+    CATEGORY = "mnodes/int/list"
+    def go(self, op, x): return (int_list_op(op[0], x),)
+
+class IntListCompare:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {"op": (list(COMPARE_OPS),), "a": _int_socket(0), "b": _int_socket(0)}}
+    INPUT_IS_LIST = True
+    RETURN_TYPES = ("INT",)
+    RETURN_NAMES = ("out",)
+    OUTPUT_IS_LIST = (True,)
+    FUNCTION = "go"
+    CATEGORY = "mnodes/int/list"
+    def go(self, op, a, b): return (int_list_op(op[0], a, b),)
+
+
+NODE_CLASS_MAPPINGS = {
+    "MIntListBinary": IntListBinary,
+    "MIntListUnary": IntListUnary,
+    "MIntListCompare": IntListCompare,
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "MIntListBinary": "M Int List Op (a, b)",
+    "MIntListUnary": "M Int List Op (x)",
+    "MIntListCompare": "M Int List Compare (0/1)",
+}
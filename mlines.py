@@ -0,0 +1,179 @@
+# mlines.py
+# File-backed line picker: options live in a .txt under the "wildcards" folder
+# (models/wildcards, or any path added for "wildcards" in extra_model_paths.yaml)
+# instead of being pasted into a widget.
+#
+# The file is mmapped, never decoded as a whole. A (start, end) byte offset per
+# non-blank line is built once and saved as .npy in the cache dir (invalidated by
+# size+mtime), later runs np.load it memory-mapped, so picking a line is O(1).
+#
+# Line numbering matches MStringPickIndex / MRegexReplaceFromLines for \n or \r\n
+# text: blank (whitespace-only) lines are skipped.
+
+import hashlib
+import mmap
+import os
+
+import folder_paths
+
+from . import mlist, mmetrics
+from .mcache import ByteLRU, CACHE_DIR, file_key
+from .mrng import MASK63, MASK64, splitmix64
+
+if "wildcards" not in folder_paths.folder_names_and_paths:
+    folder_paths.folder_names_and_paths["wildcards"] = (
+        [os.path.join(folder_paths.models_dir, "wildcards")], {".txt"})
+
+INDEX_DIR = os.path.join(CACHE_DIR, "lines")
+
+# newline scan works on windows of this many bytes, bounds the temp arrays
+_CHUNK = 16 * 1024 * 1024
+_WS = (9, 10, 11, 12, 13, 32)
+
+
+class LineSource:
+    """mmapped text file + int64 [(start, end), ...] offsets of its non-blank lines."""
+
+    def __init__(self, path: str, key):
+        self.path = path
+        self.mm = b""
+        if key[1]:
+            with open(path, "rb") as f:  # the mmap keeps its own handle
+                self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = _load_or_build_index(path, key, self.mm)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def line(self, k: int) -> str:
+        s, e = self.offsets[k]
+        return self.mm[int(s):int(e)].decode("utf-8", errors="replace")
+
+
+def _build_index(buf):
+    import numpy as np
+    a = np.frombuffer(buf, dtype=np.uint8)
+    n = len(a)
+    if n == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    nl = [np.flatnonzero(a[off:off + _CHUNK] == 10) + off for off in range(0, n, _CHUNK)]
+    nl = np.concatenate(nl).astype(np.int64)
+    starts = np.concatenate(([0], nl + 1))
+    ends = np.concatenate((nl, [n]))
+    if starts[-1] >= n:  # file ends with \n, no trailing line
+        starts, ends = starts[:-1], ends[:-1]
+
+    # \r\n -> drop the \r
+    has_cr = (ends > starts) & (a[np.maximum(ends - 1, 0)] == 13)
+    ends = ends - has_cr
+
+    # blank lines: anything starting with a non-space byte is kept right away,
+    # only empty / space-led lines get looked at one by one
+    nonempty = ends > starts
+    keep = nonempty & ~np.isin(a[np.minimum(starts, n - 1)], _WS)
+    for i in np.flatnonzero(nonempty & ~keep):
+        keep[i] = bool(bytes(buf[starts[i]:ends[i]]).strip())
+
+    return np.stack((starts[keep], ends[keep]), axis=1)
+
+
+def _index_path(path: str) -> str:
+    return os.path.join(INDEX_DIR, hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest() + ".npy")
+
+
+def _load_or_build_index(path: str, key, buf):
+    import numpy as np
+    # rows 0-1 of the saved array are (size, mtime_ns), (ctime_ns, ino) of the file it was built from
+    ip = _index_path(path)
+    head = [list(key[1:3]), list(key[3:5])]
+    try:
+        arr = np.load(ip, mmap_mode="r")
+        if arr.ndim == 2 and arr.shape[1] == 2 and len(arr) >= 2 and arr[:2].tolist() == head:
+            return arr[2:]
+    except (OSError, ValueError):
+        pass
+
+    offsets = _build_index(buf)
+    arr = np.concatenate((np.array(head, dtype=np.int64), offsets))
+    try:
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        tmp = f"{ip}.{os.getpid()}.tmp.npy"
+        np.save(tmp, arr)
+        os.replace(tmp, ip)
+    except OSError:
+        pass  # read-only cache dir, keep the in-memory index
+    return offsets
+
+
+# a handful of open files, keyed by mcache.file_key
+_SOURCES = ByteLRU(16)
+mmetrics.register_cache("lines", _SOURCES)
+
+
+def get_source(path: str) -> LineSource:
+    key = file_key(path)
+    src = _SOURCES.get(key)
+    if src is None:
+        _SOURCES.drop(lambda k: k[0] == key[0])
+        src = _SOURCES.put(key, LineSource(path, key))
+    return src
+
+
+def _resolve(file: str) -> str:
+    path = mlist.full_path("wildcards", file)
+    if path is None or not os.path.isfile(path):
+        raise FileNotFoundError(f"lines file not found: {file}")
+    return path
+
+
+# ====== M File Line Pick ======
+# mode=index:  picked_index = idx ("" when out of range), like MStringPickIndex
+# mode=seeded: picked from n exactly like MRegexReplaceFromLines (next_seed chains the same way)
+# Out: next_seed, text, picked_index, count (non-blank lines in the file)
+class MFileLinePick:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {
+            "file": (mlist.filename_list("wildcards"),),
+            "mode": (["seeded", "index"], {"default": "seeded"}),
+            "n": ("INT", {"default": 0, "min": 0, "max": 2**63 - 1, "step": 1}),
+            "idx": ("INT", {"default": 0, "min": -(2**31), "max": (2**31 - 1), "step": 1}),
+        }}
+
+    RETURN_TYPES = ("INT", "STRING", "INT", "INT")
+    RETURN_NAMES = ("next_seed", "text", "picked_index", "count")
+    FUNCTION = "go"
+    CATEGORY = "mnodes/string"
+
+    @classmethod
+    def IS_CHANGED(cls, file, **kw):
+        # rerun when the file is edited, widget changes are tracked by ComfyUI itself
+        try:
+            return ":".join(map(str, file_key(_resolve(file))))
+        except OSError:
+            return ""
+
+    def go(self, file: str, mode: str, n: int, idx: int):
+        src = get_source(_resolve(file))
+        count = len(src)
+
+        if mode == "index":
+            if idx < 0 or idx >= count:
+                return (int(n), "", int(idx), count)
+            return (int(n), src.line(int(idx)), int(idx), count)
+
+        if count == 0:
+            return (int(n), "", 0, 0)
+        r = splitmix64(int(n) & MASK64)
+        picked_index = int(r % count)
+        return (int(r & MASK63), src.line(picked_index), picked_index, count)
+
+
+NODE_CLASS_MAPPINGS = {
+    "MFileLinePick": MFileLinePick,
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "MFileLinePick": "M File Line Pick (mmap)",
+}
@@ -0,0 +1,140 @@
+# mlist.py
+# Cached model folder listings (loras, wildcards) for INPUT_TYPES and the routes.
+#
+# folder_paths.get_filename_list walks the whole tree. Here every directory is
+# remembered with its mtime, a refresh stats the known dirs and only re-lists the
+# ones whose mtime moved (adding / removing / renaming a file touches its parent dir).
+# Refreshes run at most every MNODES_LIST_TTL_S seconds (default 2).
+#
+# LIST_STATS has the timings, the first (full) listing of each folder is logged.
+
+import logging
+import os
+import threading
+import time
+
+import folder_paths
+
+from . import mmetrics
+
+TTL_S = float(os.environ.get("MNODES_LIST_TTL_S", "2"))
+
+# same as folder_paths' recursive search
+EXCLUDED_DIRS = {".git"}
+
+# totals since startup, last_ms is the latest refresh of any folder
+LIST_STATS = {"refreshes": 0, "dirs_checked": 0, "dirs_listed": 0, "last_ms": 0.0, "total_ms": 0.0}
+mmetrics.register_stats("list", LIST_STATS, gauges=("last_ms",))
+
+
+class _Listing:
+    def __init__(self, roots, exts):
+        self.roots = roots
+        self.exts = exts
+        self.dirs = {}  # dir -> (mtime_ns, file names, subdirs)
+        self.names = []
+        self.paths = {}  # name -> full path, first root wins like get_full_path
+        self.checked = 0.0
+
+    def _walk(self, root, seen):
+        # -> True if any dir under root was (re)listed
+        changed = False
+        stack = [root]
+        while stack:
+            d = stack.pop()
+            seen.add(d)
+            try:
+                mtime = os.stat(d).st_mtime_ns
+            except OSError:
+                continue
+            LIST_STATS["dirs_checked"] += 1
+            hit = self.dirs.get(d)
+            if hit is None or hit[0] != mtime:
+                files, subdirs = [], []
+                try:
+                    with os.scandir(d) as it:
+                        for e in it:
+                            try:
+                                if e.is_dir():  # follows links, as os.walk(followlinks=True) does
+                                    if e.name not in EXCLUDED_DIRS:
+                                        subdirs.append(e.path)
+                                else:
+                                    files.append(e.name)
+                            except OSError:
+                                pass
+                except OSError:
+                    continue
+                hit = self.dirs[d] = (mtime, files, subdirs)
+                LIST_STATS["dirs_listed"] += 1
+                changed = True
+            stack.extend(hit[2])
+        return changed
+
+    def refresh(self):
+        seen = set()
+        changed = False
+        for root in self.roots:
+            changed |= self._walk(root, seen)
+        gone = [d for d in self.dirs if d not in seen]
+        for d in gone:
+            del self.dirs[d]
+        if not (changed or gone):
+            return
+
+        paths = {}
+        for root in self.roots:
+            for d in sorted(d for d in self.dirs if d == root or d.startswith(root + os.sep)):
+                rel = os.path.relpath(d, root)
+                for fn in self.dirs[d][1]:
+                    if self.exts and os.path.splitext(fn)[-1].lower() not in self.exts:
+                        continue
+                    name = fn if rel == "." else os.path.join(rel, fn)
+                    paths.setdefault(name, os.path.join(d, fn))
+        self.paths = paths
+        self.names = sorted(paths)
+
+
+_LISTINGS = {}
+_LOCK = threading.Lock()
+
+
+def _listing(folder: str):
+    """Fresh enough _Listing for folder, None if folder_paths doesn't know it."""
+    entry = folder_paths.folder_names_and_paths.get(folder)
+    if entry is None:
+        return None
+    roots = tuple(os.path.abspath(p) for p in entry[0])
+    exts = frozenset(e.lower() for e in entry[1])
+    with _LOCK:
+        lst = _LISTINGS.get(folder)
+        if lst is None or lst.roots != roots or lst.exts != exts:
+            lst = _LISTINGS[folder] = _Listing(roots, exts)
+        now = time.monotonic()
+        if lst.checked and now - lst.checked < TTL_S:
+            return lst
+        first = not lst.checked
+        t0 = time.perf_counter()
+        lst.refresh()
+        ms = (time.perf_counter() - t0) * 1000
+        lst.checked = time.monotonic()
+        LIST_STATS["refreshes"] += 1
+        LIST_STATS["last_ms"] = ms
+        LIST_STATS["total_ms"] += ms
+    if first:
+        logging.info(f"[mnodes] listed {folder}: {len(lst.names)} files in {len(lst.dirs)} dirs, {ms:.0f} ms")
+    return lst
+
+
+def filename_list(folder: str) -> list:
+    lst = _listing(folder)
+    if lst is None:
+        return folder_paths.get_filename_list(folder)
+    return lst.names
+
+
+def full_path(folder: str, name: str):
+    """Like folder_paths.get_full_path, answered from the listing when possible."""
+    lst = _listing(folder)
+    if lst is not None and name in lst.paths:
+        return lst.paths[name]
+    return folder_paths.get_full_path(folder, name)
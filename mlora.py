@@ -0,0 +1,303 @@
+# mlora.py
+# LoRA file loading for mnodes, with a process-wide LRU of loaded state dicts.
+#
+# Budget: MNODES_LORA_CACHE_MB (default 4096, 0 = off).
+# Key: mcache.file_key (path, size, mtime_ns, ctime_ns, ino), so replacing a .safetensors busts its entry.
+#
+# prefetch() warms the cache when a LoRA gets picked in the UI (POST /mnodes/lora_prefetch),
+# so the job itself finds the tensors resident. A load of a file that is already being
+# read (prefetch or another node) waits for that read instead of starting a second one.
+#
+# Load modes (MNODES_LORA_LOAD_MODE, or the loader node's load_mode input):
+#   default  comfy.utils.load_torch_file, every tensor an owned copy
+#   mmap     .safetensors only: header parsed here, tensors are views into a private mmap
+#            of the file, pages are read when the patcher first touches them, nothing is copied
+# MNODES_LORA_FP16=1 (or fp16_cache) keeps fp32 weights as fp16 in the cache, half the RAM.
+# Every disk load logs its time and RSS (before / after / peak during the load) at INFO.
+# RSS comes from /proc on linux, psutil elsewhere if it's installed. The peak needs
+# linux (VmHWM, reset before the load), it's left out on other platforms.
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+
+from . import mmetrics
+from .mcache import ByteLRU, env_mb, file_key
+
+
+def _state_dict_nbytes(sd) -> int:
+    n = 0
+    for t in sd.values():
+        try:
+            n += t.numel() * t.element_size()
+        except AttributeError:
+            pass
+    return n
+
+
+LORA_CACHE = ByteLRU(env_mb("MNODES_LORA_CACHE_MB", 4096), sizeof=_state_dict_nbytes)
+mmetrics.register_cache("lora", LORA_CACHE)
+
+LOAD_MODES = ("default", "mmap")
+DEFAULT_LOAD_MODE = os.environ.get("MNODES_LORA_LOAD_MODE", "default")
+if DEFAULT_LOAD_MODE not in LOAD_MODES:
+    DEFAULT_LOAD_MODE = "default"
+DEFAULT_FP16 = os.environ.get("MNODES_LORA_FP16", "0") == "1"
+
+
+@lru_cache(maxsize=1)
+def _st_dtypes() -> dict:
+    import torch
+    d = {
+        "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+        "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8,
+        "U8": torch.uint8, "BOOL": torch.bool,
+    }
+    for name, attr in (("F8_E4M3", "float8_e4m3fn"), ("F8_E5M2", "float8_e5m2")):
+        if hasattr(torch, attr):
+            d[name] = getattr(torch, attr)
+    return d
+
+
+def load_safetensors_mmap(path: str) -> dict:
+    """
+    name -> tensor view into a copy-on-write mmap of path (no data read yet).
+    The views keep the mapping alive, it goes away with the last tensor.
+    """
+    import torch
+    dtypes = _st_dtypes()
+    with open(path, "rb") as f:
+        (n,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(n))
+        # ACCESS_COPY: writable for torch.frombuffer, writes never reach the file
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    base = 8 + n
+    sd = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = dtypes.get(info["dtype"])
+        if dtype is None:
+            raise ValueError(f"{path}: unsupported safetensors dtype {info['dtype']} ({name})")
+        start, end = info["data_offsets"]
+        shape = info["shape"]
+        if end == start:
+            sd[name] = torch.empty(shape, dtype=dtype)
+            continue
+        count = (end - start) // torch.empty((), dtype=dtype).element_size()
+        sd[name] = torch.frombuffer(mm, dtype=dtype, count=count, offset=base + start).view(shape)
+    return sd
+
+
+def _to_fp16(sd: dict) -> dict:
+    # fp32/fp64 only, bf16 is already 2 bytes and has range fp16 lacks
+    import torch
+    return {k: v.to(torch.float16) if v.dtype in (torch.float32, torch.float64) else v for k, v in sd.items()}
+
+
+def _proc_status_mb(field: str):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024  # always kB
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _rss_mb():
+    """Current RSS of this process in MB, None if there's no way to read it here."""
+    cur = _proc_status_mb("VmRSS")
+    if cur is None:
+        try:
+            import psutil
+            cur = psutil.Process().memory_info().rss / 2**20
+        except Exception:  # not installed, or no access
+            pass
+    return cur
+
+
+def _reset_peak_rss() -> bool:
+    # "5" resets VmHWM to the current RSS (linux >= 4.0), so VmHWM after the load is its peak.
+    # Process wide: a load running in parallel sees its peak restart from here too.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# last disk load, for whoever wants to check the numbers without grepping logs
+LAST_LOAD = {}
+
+
+def _mb(v) -> str:
+    return "?" if v is None else f"{v:.0f}"
+
+
+def _read_lora(lora_path: str, mode: str, fp16: bool) -> dict:
+    rss0 = _rss_mb()
+    peak_ok = _reset_peak_rss()
+    t0 = time.perf_counter()
+    if mode == "mmap" and lora_path.lower().endswith(".safetensors"):
+        sd = load_safetensors_mmap(lora_path)
+    else:
+        import comfy.utils
+        mode = "default"
+        sd = comfy.utils.load_torch_file(lora_path, safe_load=True)
+    if fp16:
+        sd = _to_fp16(sd)
+    mmetrics.inc("mnodes_bytes_read_total", os.path.getsize(lora_path), source="lora", mode=mode)
+    rss1 = _rss_mb()
+    peak = _proc_status_mb("VmHWM") if peak_ok else None
+    LAST_LOAD.clear()
+    LAST_LOAD.update(path=lora_path, mode=mode, fp16=fp16, seconds=time.perf_counter() - t0,
+                     bytes=_state_dict_nbytes(sd), rss_before_mb=rss0, rss_after_mb=rss1, peak_rss_mb=peak)
+    logging.info(
+        f"[mnodes] lora {os.path.basename(lora_path)} loaded ({mode}{', fp16' if fp16 else ''}) "
+        f"in {LAST_LOAD['seconds']:.2f}s, {LAST_LOAD['bytes'] / 2**20:.1f} MB tensors, "
+        f"rss {_mb(rss0)} -> {_mb(rss1)} MB, peak {_mb(peak)} MB")
+    return sd
+
+
+# cache key -> Future of the read in progress
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _load_opts(mode, fp16):
+    return (mode if mode in LOAD_MODES else DEFAULT_LOAD_MODE), (DEFAULT_FP16 if fp16 is None else bool(fp16))
+
+
+def load_lora_file(lora_path: str, mode: str = None, fp16: bool = None):
+    """
+    Return the LoRA state dict for lora_path, from cache if the file is unchanged.
+    The returned dict is shared, treat it as read-only.
+    mode / fp16 default to MNODES_LORA_LOAD_MODE / MNODES_LORA_FP16 and are part of the cache key.
+    """
+    mode, fp16 = _load_opts(mode, fp16)
+    key = (*file_key(lora_path), mode, fp16)
+    sd = LORA_CACHE.get(key)
+    if sd is not None:
+        return sd
+
+    with _INFLIGHT_LOCK:
+        fut = _INFLIGHT.get(key)
+        owner = fut is None
+        if owner:
+            fut = _INFLIGHT[key] = Future()
+    if not owner:
+        return fut.result()
+
+    try:
+        sd = _read_lora(lora_path, mode, fp16)
+        # older versions of the same file are dead weight now (other modes of this version stay)
+        LORA_CACHE.drop(lambda k: k[0] == key[0] and k[1:-2] != key[1:-2])
+        LORA_CACHE.put(key, sd)
+        fut.set_result(sd)
+        return sd
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+
+
+# one file at a time, a prefetch should never compete with the job for disk
+PREFETCH_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mnodes-prefetch")
+PREFETCH_STATS = {"queued": 0, "loaded": 0, "skipped": 0, "failed": 0}
+mmetrics.register_stats("prefetch", PREFETCH_STATS)
+_prefetch_lock = threading.Lock()
+_prefetch_gen = 0
+_prefetch_pending = None
+
+
+def _prefetch_job(gen: int, lora_path: str, mode: str, fp16: bool):
+    if gen != _prefetch_gen:
+        PREFETCH_STATS["skipped"] += 1  # something newer got picked meanwhile
+        return
+    try:
+        load_lora_file(lora_path, mode, fp16)
+        PREFETCH_STATS["loaded"] += 1
+    except Exception:
+        PREFETCH_STATS["failed"] += 1
+        logging.exception(f"[mnodes] lora prefetch failed: {lora_path}")
+
+
+def prefetch(lora_path: str, mode: str = None, fp16: bool = None) -> str:
+    """
+    Start loading lora_path in the background, with the load_mode / fp16_cache the
+    node will load it with (same defaults as load_lora_file). Only the latest pick
+    matters: an older prefetch that has not started yet is dropped.
+    Returns "cached", "loading", "queued" or "disabled".
+    """
+    global _prefetch_gen, _prefetch_pending
+    if LORA_CACHE.budget <= 0:
+        return "disabled"
+    mode, fp16 = _load_opts(mode, fp16)
+    key = (*file_key(lora_path), mode, fp16)
+    if key in LORA_CACHE:
+        return "cached"
+    with _INFLIGHT_LOCK:
+        if key in _INFLIGHT:
+            return "loading"
+    with _prefetch_lock:
+        _prefetch_gen += 1
+        if _prefetch_pending is not None and _prefetch_pending.cancel():
+            PREFETCH_STATS["skipped"] += 1
+        _prefetch_pending = PREFETCH_POOL.submit(_prefetch_job, _prefetch_gen, lora_path, mode, fp16)
+    PREFETCH_STATS["queued"] += 1
+    return "queued"
+
+
+def cache_stats() -> dict:
+    return {**LORA_CACHE.stats(), "prefetch": dict(PREFETCH_STATS)}
+
+
+def load_lora_files(paths, max_workers: int = 4):
+    """load_lora_file for every path, concurrently, in the given order."""
+    if len(paths) <= 1:
+        return [load_lora_file(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths)), thread_name_prefix="mnodes-lora") as pool:
+        return list(pool.map(load_lora_file, paths))
+
+
+def apply_loras(model, clip, items):
+    """
+    Patch several LoRAs onto ONE clone of model and clip.
+    items: [(state_dict, strength_model, strength_clip), ...]
+    Same patches as chaining comfy.sd.load_lora_for_models, minus a clone and key map per LoRA.
+    """
+    import comfy.lora
+    try:
+        from comfy.lora_convert import convert_lora
+    except ImportError:  # older ComfyUI
+        convert_lora = None
+
+    key_map = {}
+    if model is not None:
+        key_map = comfy.lora.model_lora_keys_unet(model.model, key_map)
+    if clip is not None:
+        key_map = comfy.lora.model_lora_keys_clip(clip.cond_stage_model, key_map)
+
+    new_model = model.clone() if model is not None else None
+    new_clip = clip.clone() if clip is not None else None
+    for sd, strength_model, strength_clip in items:
+        if convert_lora is not None:
+            sd = convert_lora(sd)
+        loaded = comfy.lora.load_lora(sd, key_map)
+        k = set(new_model.add_patches(loaded, strength_model)) if new_model is not None else set()
+        k1 = set(new_clip.add_patches(loaded, strength_clip)) if new_clip is not None else set()
+        for x in loaded:
+            if x not in k and x not in k1:
+                logging.warning("NOT LOADED {}".format(x))
+    return new_model, new_clip
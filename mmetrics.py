@@ -0,0 +1,237 @@
+# mmetrics.py
+# In-process metrics for mnodes, served as Prometheus text at GET /mnodes/metrics.
+#
+#   counters    inc("mnodes_bytes_read_total", n, source="lora")
+#   histograms  with timed("mnodes_lora_load_phase_seconds", phase="disk"): ...
+#   caches      register_cache("lora", LORA_CACHE)   ByteLRU hits / misses / bytes, read at scrape time
+#   stats dicts register_stats("fold", FOLD_STATS)   plain numeric dicts of running totals, exported as
+#                                                     mnodes_fold_<key>_total counters, keys in gauges= as gauges
+#
+# Every node's FUNCTION gets wrapped at registration (instrument_nodes in __init__.py),
+# routes opt in with @timed_route.
+#
+# MNODES_METRICS=0 turns it all off: nothing gets wrapped, timed() hands back a shared
+# no-op and inc() returns right away.
+
+import bisect
+import functools
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("MNODES_METRICS", "1") != "0"
+
+# seconds, upper bounds, +Inf is implied
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> value
+_hists = {}     # (name, labels) -> [bucket counts..., +Inf count], sum
+_caches = {}    # name -> ByteLRU
+_stats = {}     # prefix -> (dict, gauge keys)
+
+HELP = {
+    "mnodes_node_seconds": "node FUNCTION wall time",
+    "mnodes_node_errors_total": "node FUNCTION calls that raised",
+    "mnodes_lora_load_phase_seconds": "LoRA loader time per phase (sidecar, thumb, disk, patch)",
+    "mnodes_bytes_read_total": "bytes read from disk (lora: file size of every uncached load)",
+    "mnodes_http_request_seconds": "mnodes route handler time",
+    "mnodes_http_requests_total": "mnodes route requests by status",
+    "mnodes_http_response_bytes_total": "mnodes route response body bytes",
+}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name: str, value=1, **labels):
+    if not ENABLED:
+        return
+    k = _key(name, labels)
+    with _lock:
+        _counters[k] = _counters.get(k, 0) + value
+
+
+def observe(name: str, seconds: float, **labels):
+    if not ENABLED:
+        return
+    k = _key(name, labels)
+    i = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        h = _hists.get(k)
+        if h is None:
+            h = _hists[k] = [[0] * (len(BUCKETS) + 1), 0.0]
+        h[0][i] += 1
+        h[1] += seconds
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "t")
+
+    def __init__(self, name, labels):
+        self.name, self.labels = name, labels
+
+    def __enter__(self):
+        self.t = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t, **self.labels)
+        return False
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timed(name: str, **labels):
+    """with timed(...): observes the block's wall time, also when it raises."""
+    return _Timer(name, labels) if ENABLED else _NO_TIMER
+
+
+def register_cache(name: str, cache):
+    _caches[name] = cache
+
+
+def register_stats(prefix: str, stats: dict, gauges=()):
+    """stats values only go up (totals since startup), except the keys named in gauges."""
+    _stats[prefix] = (stats, frozenset(gauges))
+
+
+# ---------------- wrapping ----------------
+
+def instrument_nodes(class_mappings: dict):
+    """Wrap FUNCTION of every node class with a timer + error counter, once per class."""
+    if not ENABLED:
+        return
+    for key, cls in class_mappings.items():
+        fname = getattr(cls, "FUNCTION", None)
+        fn = cls.__dict__.get(fname) if fname else None
+        if not callable(fn) or getattr(fn, "_mnodes_metrics", False):
+            continue
+        setattr(cls, fname, _wrap_node(fn, key))
+
+
+def _wrap_node(fn, key):
+    @functools.wraps(fn)
+    def wrapper(*args, **kw):
+        t = time.perf_counter()
+        try:
+            return fn(*args, **kw)
+        except BaseException:
+            inc("mnodes_node_errors_total", node=key)
+            raise
+        finally:
+            observe("mnodes_node_seconds", time.perf_counter() - t, node=key)
+    wrapper._mnodes_metrics = True
+    return wrapper
+
+
+def timed_route(route: str):
+    """Decorator for aiohttp handlers: latency, status and body bytes per route."""
+    def deco(handler):
+        if not ENABLED:
+            return handler
+
+        @functools.wraps(handler)
+        async def wrapper(request):
+            t = time.perf_counter()
+            status = 500
+            try:
+                resp = await handler(request)
+                status = resp.status
+                body = getattr(resp, "body", None)
+                if isinstance(body, (bytes, bytearray)):
+                    inc("mnodes_http_response_bytes_total", len(body), route=route)
+                return resp
+            except Exception as e:
+                status = getattr(e, "status", 500)  # aiohttp HTTPException
+                raise
+            finally:
+                observe("mnodes_http_request_seconds", time.perf_counter() - t, route=route)
+                inc("mnodes_http_requests_total", route=route, status=str(status))
+        return wrapper
+    return deco
+
+
+# ---------------- exposition ----------------
+
+def _esc(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels, extra=()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_esc(v)}"' for k, v in items) + "}"
+
+
+def _num(v) -> str:
+    if isinstance(v, float):
+        if v != v:
+            return "NaN"
+        if v in (float("inf"), float("-inf")):
+            return "+Inf" if v > 0 else "-Inf"
+        return repr(v)
+    return str(v)
+
+
+def render() -> str:
+    """Prometheus text exposition format 0.0.4."""
+    with _lock:
+        counters = dict(_counters)
+        hists = {k: (list(v[0]), v[1]) for k, v in _hists.items()}
+
+    out = []
+    typed = set()
+
+    def head(name, kind):
+        if name not in typed:
+            typed.add(name)
+            if name in HELP:
+                out.append(f"# HELP {name} {HELP[name]}")
+            out.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), v in sorted(counters.items()):
+        head(name, "counter")
+        out.append(f"{name}{_labels(labels)} {_num(v)}")
+
+    for (name, labels), (buckets, total) in sorted(hists.items()):
+        head(name, "histogram")
+        acc = 0
+        for le, n in zip([repr(b) for b in BUCKETS] + ["+Inf"], buckets):
+            acc += n
+            out.append(f"{name}_bucket{_labels(labels, [('le', le)])} {acc}")
+        out.append(f"{name}_sum{_labels(labels)} {_num(total)}")
+        out.append(f"{name}_count{_labels(labels)} {acc}")
+
+    cache_stats = {name: c.stats() for name, c in sorted(_caches.items())}
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                        ("entries", "gauge"), ("bytes", "gauge"), ("budget", "gauge"), ("hit_rate", "gauge")):
+        metric = f"mnodes_cache_{field}" + ("_total" if kind == "counter" else "")
+        for name, st in cache_stats.items():
+            if field in st and st[field] is not None:
+                head(metric, kind)
+                out.append(f"{metric}{_labels([('cache', name)])} {_num(st[field])}")
+
+    for prefix, (stats, gauges) in sorted(_stats.items()):
+        for k, v in sorted(stats.items()):
+            if isinstance(v, bool) or not isinstance(v, (int, float)):
+                continue
+            kind = "gauge" if k in gauges else "counter"
+            metric = f"mnodes_{prefix}_{k}" + ("_total" if kind == "counter" else "")
+            head(metric, kind)
+            out.append(f"{metric} {_num(v)}")
+
+    return "\n".join(out) + "\n"
@@ -28,6 +28,10 @@ class IntModulo:
     # Where the node appears in the right-click menu.
     CATEGORY = "mnodes/math"
 
+    # Output depends only on the inputs, so mnodes may fold it to a constant
+    # before the prompt runs (see mfold.py).
+    PURE = True
+
     def mod(self, a: int, b: int):
         # Avoid crashing on divide-by-zero.
         # You can change this behavior (raise, clamp, etc) if you prefer.
@@ -0,0 +1,53 @@
+# mrng.py
+# splitmix64 helpers shared by the mnodes pickers.
+#
+# Two ways to step a seed n:
+#   chain:   n_{k+1} = splitmix64(n_k) & MASK63   (what next_seed -> n wiring does)
+#            every step needs the previous one, no shortcut.
+#   counter: r_k = splitmix64(n + k * GAMMA)       (the plain splitmix64 stream)
+#            any k is O(1) and vectorizes. k = 0 is the same as one chain step.
+
+MASK64 = (1 << 64) - 1
+MASK63 = (1 << 63) - 1
+GAMMA = 0x9E3779B97F4A7C15
+
+
+def splitmix64(x: int) -> int:
+    x = (x + GAMMA) & MASK64
+    z = x
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EB & MASK64
+    return (z ^ (z >> 31)) & MASK64
+
+
+def splitmix64_np(x):
+    """splitmix64 over a uint64 array, bit-identical to splitmix64() per element."""
+    import numpy as np
+    u = np.uint64
+    with np.errstate(over="ignore"):
+        x = np.asarray(x, dtype=np.uint64) + u(GAMMA)
+        z = (x ^ (x >> u(30))) * u(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> u(27))) * u(0x94D049BB133111EB)
+        return z ^ (z >> u(31))
+
+
+def chain_seeds(n: int, count: int) -> list:
+    # [n, next(n), next(next(n)), ...], count entries
+    seeds = [int(n)]
+    for _ in range(int(count) - 1):
+        seeds.append(splitmix64(seeds[-1] & MASK64) & MASK63)
+    return seeds
+
+
+def counter_at(n: int, k: int) -> int:
+    # k-th output of the counter stream started at n
+    return splitmix64((int(n) + int(k) * GAMMA) & MASK64)
+
+
+def counter_np(n: int, ks):
+    """counter_at(n, k) for every k in ks, as a uint64 array."""
+    import numpy as np
+    u = np.uint64
+    with np.errstate(over="ignore"):
+        x = u(int(n) & MASK64) + np.asarray(ks, dtype=np.uint64) * u(GAMMA)
+    return splitmix64_np(x)
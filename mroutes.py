@@ -0,0 +1,259 @@
+# mroutes.py
+# HTTP routes for the mnodes frontend (js/lora_sidecar_preview.js)
+#
+# File reads never run on the event loop: they go through a small thread pool,
+# and finished responses are cached until a sidecar's mtime changes.
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+from server import PromptServer
+
+from .mcache import ByteLRU, env_mb, stat_sig
+from . import mhash, mindex, mlist, mlora, mmetrics, mthumb
+from .msidecar import read_sidecar
+
+# disk reads only, a few threads is plenty even on network shares
+IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mnodes-io")
+
+# hashing is long running, keep it off the IO pool, mhash fans out to its own threads
+HASH_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mnodes-hash")
+
+# lora path -> sidecar payload, validated by the sidecars' mcache.stat_sig
+SIDECAR_CACHE = ByteLRU(env_mb("MNODES_SIDECAR_CACHE_MB", 64),
+                        sizeof=lambda v: len(v[1]["meta"]))
+mmetrics.register_cache("sidecar_payload", SIDECAR_CACHE)
+
+
+async def run_io(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(IO_POOL, fn, *args)
+
+
+def _stat_sig(path: str):
+    try:
+        return stat_sig(os.stat(path))
+    except OSError:
+        return None
+
+
+def _read_sidecar(lora_path: str) -> dict:
+    base, _ = os.path.splitext(lora_path)
+    txtp = base + ".txt"
+    pngp = base + ".png"
+    sig = (_stat_sig(txtp), _stat_sig(pngp))
+
+    hit = SIDECAR_CACHE.get(lora_path)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
+
+    sc = read_sidecar(txtp) if sig[0] is not None else None
+    # header fields only, the image itself comes from /mnodes/lora_thumb
+    payload = {
+        "meta": sc.header if sc is not None else "",
+        "trainedWords": ", ".join(sc.trained_words) if sc is not None else "",
+        "baseModel": sc.base_model if sc is not None else "",
+        "recommendedWeight": sc.recommended_weight if sc is not None else None,
+        "has_description": sc is not None and sc.has_description,
+        "has_thumb": sig[1] is not None,
+    }
+    SIDECAR_CACHE.put(lora_path, (sig, payload))
+    return payload
+
+
+def _resolve_lora(name: str):
+    lora_path = mlist.full_path("loras", name)
+    if not lora_path or not os.path.isfile(lora_path):
+        return None
+    return lora_path
+
+
+def _read_descriptions(lora_path: str):
+    # (model, version) description, None if the .txt went away since _read_sidecar looked
+    try:
+        sc = read_sidecar(os.path.splitext(lora_path)[0] + ".txt")
+        return sc.descriptions() if sc is not None else None
+    except OSError:
+        return None
+
+
+@PromptServer.instance.routes.get("/mnodes/lora_sidecar")
+@mmetrics.timed_route("lora_sidecar")
+async def mnodes_lora_sidecar(request):
+    name = request.rel_url.query.get("name", "")
+    lora_path = await run_io(_resolve_lora, name)
+    if lora_path is None:
+        return web.json_response({"error": "lora not found"}, status=404)
+
+    payload = await run_io(_read_sidecar, lora_path)
+    if request.rel_url.query.get("full") == "1" and payload["has_description"]:
+        desc = await run_io(_read_descriptions, lora_path)
+        if desc is not None:
+            payload = {**payload, "modelDescription": desc[0], "versionDescription": desc[1]}
+    return web.json_response(payload)
+
+
+# one POST for every loader node in a workflow instead of one GET each,
+# more names than BATCH_MAX is a 413 (the js splits its queue into chunks of this size)
+BATCH_MAX = 256
+
+
+def _read_sidecar_by_name(name: str) -> dict:
+    lora_path = _resolve_lora(name)
+    if lora_path is None:
+        return {"error": "lora not found"}
+    return _read_sidecar(lora_path)
+
+
+@PromptServer.instance.routes.post("/mnodes/lora_sidecar_batch")
+@mmetrics.timed_route("lora_sidecar_batch")
+async def mnodes_lora_sidecar_batch(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        return web.json_response({"error": "bad json"}, status=400)
+    names = body.get("names") if isinstance(body, dict) else None
+    if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+        return web.json_response({"error": "names must be a list of strings"}, status=400)
+    names = list(dict.fromkeys(names))
+    if len(names) > BATCH_MAX:
+        return web.json_response({"error": f"too many names ({len(names)} > {BATCH_MAX})", "max": BATCH_MAX},
+                                 status=413)
+
+    results = await asyncio.gather(*(run_io(_read_sidecar_by_name, n) for n in names))
+    return web.json_response({"items": dict(zip(names, results))})
+
+
+def _prefetch(name: str, mode, fp16) -> str:
+    lora_path = _resolve_lora(name)
+    return mlora.prefetch(lora_path, mode, fp16) if lora_path is not None else None
+
+
+# {"name": ..., "load_mode": ..., "fp16_cache": ...} -> {"status": queued|loading|cached|disabled},
+# the load itself runs on mlora's prefetch thread, load_mode / fp16_cache as on the node (optional)
+@PromptServer.instance.routes.post("/mnodes/lora_prefetch")
+@mmetrics.timed_route("lora_prefetch")
+async def mnodes_lora_prefetch(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        return web.json_response({"error": "bad json"}, status=400)
+    name = body.get("name") if isinstance(body, dict) else None
+    if not isinstance(name, str) or not name:
+        return web.json_response({"error": "name must be a string"}, status=400)
+    mode, fp16 = body.get("load_mode"), body.get("fp16_cache")
+    if mode is not None and mode not in mlora.LOAD_MODES:
+        return web.json_response({"error": f"load_mode must be one of {', '.join(mlora.LOAD_MODES)}"}, status=400)
+    if fp16 is not None and not isinstance(fp16, bool):
+        return web.json_response({"error": "fp16_cache must be a boolean"}, status=400)
+    status = await run_io(_prefetch, name, mode, fp16)
+    if status is None:
+        return web.json_response({"error": "lora not found"}, status=404)
+    return web.json_response({"status": status})
+
+
+@PromptServer.instance.routes.get("/mnodes/lora_thumb")
+@mmetrics.timed_route("lora_thumb")
+async def mnodes_lora_thumb(request):
+    q = request.rel_url.query
+    try:
+        size = mthumb.snap_size(int(q.get("size", "512")))
+    except ValueError:
+        return web.json_response({"error": "bad size"}, status=400)
+
+    lora_path = await run_io(_resolve_lora, q.get("name", ""))
+    if lora_path is None:
+        return web.json_response({"error": "lora not found"}, status=404)
+    pngp = os.path.splitext(lora_path)[0] + ".png"
+
+    headers = {"Cache-Control": "no-cache"}  # always revalidate, 304 is cheap
+    etag = await run_io(mthumb.thumb_etag, pngp, size)
+    if etag is None:
+        return web.json_response({"error": "no thumbnail"}, status=404)
+    quoted = f'"{etag}"'
+    inm = request.headers.get("If-None-Match", "")
+    if quoted in [t.strip().removeprefix("W/") for t in inm.split(",")]:
+        return web.Response(status=304, headers={**headers, "ETag": quoted})
+
+    res = await run_io(mthumb.thumb_bytes, pngp, size)
+    if res is None:
+        return web.json_response({"error": "no thumbnail"}, status=404)
+    data, ctype, etag = res
+    return web.Response(body=data, content_type=ctype, headers={**headers, "ETag": f'"{etag}"'})
+
+
+def _lora_entries():
+    for name in mlist.filename_list("loras"):
+        path = mlist.full_path("loras", name)
+        if path:
+            yield name, path
+
+
+def _search(q) -> dict:
+    idx = mindex.get_index()
+    idx.refresh(_lora_entries(), force=q.get("rescan") == "1")
+    return idx.query(
+        base_model=q.get("base_model", ""),
+        word=q.get("word", ""),
+        tag=q.get("tag", ""),
+        prefix=q.get("prefix", ""),
+        offset=max(0, int(q.get("offset", "0"))),
+        limit=min(500, max(1, int(q.get("limit", "50")))),
+    )
+
+
+# ?base_model=&word=&tag=&prefix=&offset=&limit=&rescan=1
+@PromptServer.instance.routes.get("/mnodes/lora_search")
+@mmetrics.timed_route("lora_search")
+async def mnodes_lora_search(request):
+    try:
+        return web.json_response(await run_io(_search, request.rel_url.query))
+    except ValueError:
+        return web.json_response({"error": "offset/limit must be integers"}, status=400)
+
+
+def _hash_loras(names) -> dict:
+    paths = {}
+    for name in names:
+        p = _resolve_lora(name)
+        if p is not None:
+            paths[name] = os.path.abspath(p)
+    res = mhash.hash_files(paths.values(), processes=False, workers=4)
+    return {name: res.get(p, {"error": "unreadable"}) for name, p in paths.items()}
+
+
+# {"names": [...]} or {"all": true} -> {"items": {name: {sha256, autov2, blake3}}}
+@PromptServer.instance.routes.post("/mnodes/lora_hashes")
+@mmetrics.timed_route("lora_hashes")
+async def mnodes_lora_hashes(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        return web.json_response({"error": "bad json"}, status=400)
+    if not isinstance(body, dict):
+        return web.json_response({"error": "expected an object"}, status=400)
+    if body.get("all"):
+        names = await run_io(mlist.filename_list, "loras")
+    else:
+        names = body.get("names")
+        if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+            return web.json_response({"error": "names must be a list of strings"}, status=400)
+
+    items = await asyncio.get_running_loop().run_in_executor(HASH_POOL, _hash_loras, names)
+    return web.json_response({"items": items})
+
+
+# startup import times and folder listing stats, GET /mnodes/timings
+@PromptServer.instance.routes.get("/mnodes/timings")
+async def mnodes_timings(request):
+    from . import IMPORT_TIMES
+    return web.json_response({"import_ms": IMPORT_TIMES, "listing": mlist.LIST_STATS})
+
+
+# Prometheus text format, see mmetrics.py
+@PromptServer.instance.routes.get("/mnodes/metrics")
+async def mnodes_metrics(request):
+    text = mmetrics.render() if mmetrics.ENABLED else "# mnodes metrics are off (MNODES_METRICS=0)\n"
+    return web.Response(body=text.encode("utf-8"),
+                        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
@@ -0,0 +1,162 @@
+# msidecar.py
+# Parser for <lora>.txt sidecars (format written by util/civs.sh).
+#
+# Only the key:"value" header is read. The file is streamed line by line and
+# reading stops at "--- modelDescription ---", the (often huge, html) description
+# blocks are only loaded when Sidecar.descriptions() is called.
+# Plain free-text sidecars (no delimiter) are read whole, same as before.
+
+import math
+import os
+import re
+from dataclasses import dataclass, field
+
+from . import mmetrics
+from .mcache import ByteLRU, file_key
+
+MODEL_DESC_DELIM = "--- modelDescription ---"
+VERSION_DESC_DELIM = "--- versionDescription ---"
+
+_KEY_RE = re.compile(r'^([A-Za-z_]\w*)\s*:\s*(.*)$')
+_CLOSE_RE = re.compile(r'^(.*)"\s*(?:#[^"]*)?$')
+_WEIGHT_RE = re.compile(r'recommendedWeight\s*:\s*"?([0-9]+(?:\.[0-9]+)?)"?', re.I)
+_LORA_TAG_RE = re.compile(r"<lora:[^:>]+:([0-9]+(?:\.[0-9]+)?)>", re.I)
+
+_EXAMPLE_KEYS = {
+    "prompt": "examplePrompt",
+    "negative": "exampleNegativePrompt",
+    "sampler": "exampleSampler",
+    "steps": "exampleSteps",
+    "cfg": "exampleCfgScale",
+    "seed": "exampleSeed",
+    "size": "exampleSize",
+}
+
+
+def _split_list(s: str):
+    return [w.strip() for w in s.split(",") if w.strip()]
+
+
+@dataclass
+class Sidecar:
+    path: str
+    header: str                      # raw text before the description block
+    fields: dict                     # every key:"value" in the header
+    desc_offset: int = -1            # byte offset of the description block, -1 = none
+    trained_words: list = field(default_factory=list)
+    base_model: str = ""
+    recommended_weight: float = None
+    hashes: dict = field(default_factory=dict)   # sha256 / autov2 / blake3, lowercase hex
+    example: dict = field(default_factory=dict)  # prompt, negative, sampler, steps, cfg, seed, size
+
+    @property
+    def has_description(self) -> bool:
+        return self.desc_offset >= 0
+
+    def descriptions(self):
+        # (model_description, version_description), read from disk on demand
+        if self.desc_offset < 0:
+            return "", ""
+        with open(self.path, "rb") as f:
+            f.seek(self.desc_offset)
+            rest = f.read().decode("utf-8", errors="replace")
+        rest = rest.split("\n", 1)[1] if "\n" in rest else ""
+        model_desc, _, version_desc = rest.partition(VERSION_DESC_DELIM)
+        return model_desc.strip("\r\n"), version_desc.strip("\r\n")
+
+
+def _as_weight(s):
+    # float() also takes "nan", "inf", "-2" and 400 digit numbers, none of those is a weight
+    try:
+        w = float(s)
+    except ValueError:
+        return None
+    return w if math.isfinite(w) and w >= 0 else None
+
+
+def _weight(fields: dict, header: str):
+    w = _as_weight(fields.get("recommendedWeight", ""))
+    if w is not None:
+        return w
+    # loose formats: recommendedWeight:0.7 or a <lora:name:0.7> anywhere in the header
+    for rx in (_WEIGHT_RE, _LORA_TAG_RE):
+        for m in rx.finditer(header):
+            w = _as_weight(m.group(1))
+            if w is not None:
+                return w
+    return None
+
+
+def parse_sidecar(path: str) -> Sidecar:
+    lines = []
+    fields = {}
+    key, buf = None, []
+    offset, desc_offset = 0, -1
+    with open(path, "rb") as f:
+        for raw in f:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if key is None and line.startswith(MODEL_DESC_DELIM):
+                desc_offset = offset
+                break
+            offset += len(raw)
+            lines.append(line)
+
+            if key is not None:
+                m = _CLOSE_RE.match(line)
+                if m:
+                    buf.append(m.group(1))
+                    fields[key] = "\n".join(buf)
+                    key = None
+                else:
+                    buf.append(line)
+                continue
+            m = _KEY_RE.match(line)
+            if not m:
+                continue
+            k, rest = m.groups()
+            if not rest.startswith('"'):
+                fields[k] = rest.strip()
+                continue
+            m = _CLOSE_RE.match(rest[1:])
+            if m:
+                fields[k] = m.group(1)
+            else:
+                key, buf = k, [rest[1:]]
+
+    header = "\n".join(lines).rstrip("\n")
+    return Sidecar(
+        path=path,
+        header=header,
+        fields=fields,
+        desc_offset=desc_offset,
+        trained_words=_split_list(fields.get("trainedWords", "")),
+        base_model=fields.get("baseModel", ""),
+        recommended_weight=_weight(fields, header),
+        hashes={k: fields.get(f, "").lower() for k, f in
+                (("sha256", "hashSHA256"), ("autov2", "hashAutoV2"), ("blake3", "hashBLAKE3"))
+                if fields.get(f)},
+        example={k: fields[f] for k, f in _EXAMPLE_KEYS.items() if fields.get(f)},
+    )
+
+
+# parsed headers are small, keep a few thousand around
+_CACHE = ByteLRU(16 * 1024 * 1024, sizeof=lambda sc: len(sc.header) + 256)
+mmetrics.register_cache("sidecar", _CACHE)
+
+
+def read_sidecar(path: str):
+    """Parsed Sidecar for path (cached by size+mtime), None if there is no such file."""
+    try:
+        key = file_key(path)
+    except OSError:
+        return None
+    sc = _CACHE.get(key)
+    if sc is None:
+        sc = _CACHE.put(key, parse_sidecar(path))
+        # the parser stops at the description block
+        mmetrics.inc("mnodes_bytes_read_total", sc.desc_offset if sc.desc_offset >= 0 else key[1], source="sidecar")
+    return sc
+
+
+def sidecar_for_lora(lora_path: str):
+    return read_sidecar(os.path.splitext(lora_path)[0] + ".txt")
@@ -1,8 +1,36 @@
 
 # mstring.py
-# string helpers (ONLY TWO NODES)
+# string helpers
 
 import re
+from functools import lru_cache
+
+from .mrng import MASK63, MASK64, chain_seeds, counter_at, counter_np, splitmix64, splitmix64_np
+
+
+# Same option/lines text comes in on every run of a graph, so parse it once.
+# lru_cache hashes the str (CPython caches a str's hash), a hit costs one dict lookup
+# instead of a splitlines() over the whole (possibly 100k line) text.
+@lru_cache(maxsize=32)
+def _nonblank_lines(text: str) -> tuple:
+    return tuple(ln for ln in text.splitlines() if ln.strip() != "")
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str, flags: int):
+    return re.compile(pattern, flags)
+
+
+def _regex_flags(case_insensitive: bool, multiline: bool, dotall: bool) -> int:
+    flags = 0
+    if case_insensitive:
+        flags |= re.IGNORECASE
+    if multiline:
+        flags |= re.MULTILINE
+    if dotall:
+        flags |= re.DOTALL
+    return flags
+
 
 # ====== M String Pick (index) ======
 # In:  idx (INT), lines (STRING multiline)
@@ -19,9 +47,10 @@ class MStringPickIndex:
     RETURN_NAMES = ("text",)
     FUNCTION = "go"
     CATEGORY = "mnodes/string"
+    PURE = True  # see mfold.py
 
     def go(self, idx: int, lines: str):
-        arr = [ln for ln in lines.splitlines() if ln.strip() != ""]
+        arr = _nonblank_lines(lines)
         if not arr:
             return ("",)
         if idx < 0 or idx >= len(arr):
@@ -29,6 +58,30 @@ class MStringPickIndex:
         return (arr[int(idx)],)
 
 
+# ====== M String Pick (index list) ======
+# In:  idx (INT, list), lines (STRING multiline)
+# Out: text (STRING, list), one entry per idx, "" when out of range
+class MStringPickIndexBatch:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {
+            "idx": ("INT", {"default": 0, "min": -(2**31), "max": (2**31 - 1), "step": 1}),
+            "lines": ("STRING", {"default": "a\nb\nc", "multiline": True}),
+        }}
+
+    INPUT_IS_LIST = True
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("text",)
+    OUTPUT_IS_LIST = (True,)
+    FUNCTION = "go"
+    CATEGORY = "mnodes/string"
+
+    def go(self, idx, lines):
+        arr = _nonblank_lines(lines[0])
+        n = len(arr)
+        return ([arr[int(i)] if 0 <= i < n else "" for i in idx],)
+
+
 # ====== M Regex Replace (picked option) ======
 # NOTE: input is named "n" (not "seed") to avoid ComfyUI's extra "control after generate" seed UI.
 # In order: n, text, pattern, options, then regex settings
@@ -60,45 +113,134 @@ class MRegexReplaceFromLines:
     def go(self, n: int, text: str, pattern: str, options: str,
            case_insensitive: bool, multiline: bool, dotall: bool, max_replacements: int):
 
-        opts = [ln for ln in options.splitlines() if ln.strip() != ""]
+        opts = _nonblank_lines(options)
         if not opts:
             return (int(n), text, "", 0)
 
-        MASK64 = (1 << 64) - 1
-        MASK63 = (1 << 63) - 1
-
-        def splitmix64(x: int) -> int:
-            x = (x + 0x9E3779B97F4A7C15) & MASK64
-            z = x
-            z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
-            z = (z ^ (z >> 27)) * 0x94D049BB133111EB & MASK64
-            return (z ^ (z >> 31)) & MASK64
-
         r = splitmix64(int(n) & MASK64)
         picked_index = int(r % len(opts))
         picked_option = opts[picked_index]
         next_seed = int(r & MASK63)
 
-        flags = 0
-        if case_insensitive:
-            flags |= re.IGNORECASE
-        if multiline:
-            flags |= re.MULTILINE
-        if dotall:
-            flags |= re.DOTALL
-
-        rx = re.compile(pattern, flags)
+        rx = _compile(pattern, _regex_flags(case_insensitive, multiline, dotall))
         out_text = rx.sub(picked_option, text, count=(max_replacements if max_replacements > 0 else 0))
         return (next_seed, out_text, picked_option, picked_index)
 
 
+# ====== M Regex Replace (batch) ======
+# Same as above, but emits N results in one execution (list outputs).
+# n as a single value: walk the next_seed chain for `count` steps (same as chaining N nodes).
+# n as a list (e.g. a seed list): one pick per seed, mixed in one vectorized pass.
+# stepping=counter: picks k = 0..count-1 of the counter stream (see mrng.py), fully vectorized.
+class MRegexReplaceFromLinesBatch:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {
+            "n": ("INT", {"default": 0, "min": 0, "max": 2**63 - 1, "step": 1}),
+            "count": ("INT", {"default": 4, "min": 1, "max": 100000, "step": 1}),
+            "text": ("STRING", {"default": "", "multiline": False}),
+            "pattern": ("STRING", {"default": "SKIN", "multiline": False}),
+            "options": ("STRING", {"default": "pink\ngreen\nblue\n", "multiline": True}),
+            "case_insensitive": ("BOOLEAN", {"default": False}),
+            "multiline": ("BOOLEAN", {"default": False}),
+            "dotall": ("BOOLEAN", {"default": True}),
+            "max_replacements": ("INT", {"default": 0, "min": 0, "max": 999999, "step": 1}),  # 0=all
+        }, "optional": {
+            # chain = same picks as wiring next_seed -> n, counter = MSeedAtStep(n, 0..count-1)
+            "stepping": (["chain", "counter"], {"default": "chain"}),
+        }}
+
+    INPUT_IS_LIST = True
+    RETURN_TYPES = ("INT", "STRING", "STRING", "INT")
+    RETURN_NAMES = ("next_seed", "out_text", "picked_option", "picked_index")
+    OUTPUT_IS_LIST = (True, True, True, True)
+    FUNCTION = "go"
+    CATEGORY = "mnodes/string"
+
+    def go(self, n, count, text, pattern, options, case_insensitive, multiline, dotall, max_replacements,
+           stepping=None):
+        text, pattern, options = text[0], pattern[0], options[0]
+        max_replacements = max_replacements[0]
+
+        stepping = stepping[0] if stepping else "chain"
+
+        opts = _nonblank_lines(options)
+        if not opts:
+            # like the single node: n passes through unchanged, in both stepping modes
+            nexts = [int(n[0])] * int(count[0]) if len(n) == 1 else [int(x) for x in n]
+            k = len(nexts)
+            return (nexts, [text] * k, [""] * k, [0] * k)
+
+        if len(n) == 1 and stepping == "counter":
+            seeds = None
+            k = int(count[0])
+        elif len(n) == 1:
+            seeds = chain_seeds(n[0], count[0])
+            k = len(seeds)
+        else:
+            seeds = [int(x) for x in n]
+            k = len(seeds)
+
+        import numpy as np
+        if seeds is None:
+            r = counter_np(n[0], np.arange(k, dtype=np.uint64))
+        else:
+            r = splitmix64_np([s & MASK64 for s in seeds])
+        picked = (r % np.uint64(len(opts))).tolist()
+        next_seeds = (r & np.uint64(MASK63)).tolist()
+
+        rx = _compile(pattern, _regex_flags(case_insensitive[0], multiline[0], dotall[0]))
+        cnt = max_replacements if max_replacements > 0 else 0
+        subbed = {}  # option index -> out_text, at most len(opts) subs
+        out_text = []
+        for i in picked:
+            if i not in subbed:
+                subbed[i] = rx.sub(opts[i], text, count=cnt)
+            out_text.append(subbed[i])
+
+        return (next_seeds, out_text, [opts[i] for i in picked], picked)
+
+
+# ====== M Seed At Step ======
+# k-th pick of the splitmix64 counter stream started at n, without walking a chain.
+# With options, k = 0 gives the same (next_seed, picked_option, picked_index) as MRegexReplaceFromLines.
+# Steps k > 0 follow the counter stream (mrng.py), not the next_seed chain.
+class MSeedAtStep:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {
+            "n": ("INT", {"default": 0, "min": 0, "max": 2**63 - 1, "step": 1}),
+            "k": ("INT", {"default": 0, "min": 0, "max": 2**63 - 1, "step": 1}),
+            "options": ("STRING", {"default": "pink\ngreen\nblue\n", "multiline": True}),
+        }}
+
+    RETURN_TYPES = ("INT", "STRING", "INT")
+    RETURN_NAMES = ("seed", "picked_option", "picked_index")
+    FUNCTION = "go"
+    CATEGORY = "mnodes/string"
+
+    def go(self, n: int, k: int, options: str):
+        r = counter_at(n, k)
+        opts = _nonblank_lines(options)
+        if not opts:
+            return (int(r & MASK63), "", 0)
+        picked_index = int(r % len(opts))
+        return (int(r & MASK63), opts[picked_index], picked_index)
+
+
 NODE_CLASS_MAPPINGS = {
     "MStringPickIndex": MStringPickIndex,
+    "MStringPickIndexBatch": MStringPickIndexBatch,
     "MRegexReplaceFromLines": MRegexReplaceFromLines,
+    "MRegexReplaceFromLinesBatch": MRegexReplaceFromLinesBatch,
+    "MSeedAtStep": MSeedAtStep,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "MStringPickIndex": "M String Pick (index)",
+    "MStringPickIndexBatch": "M String Pick (index list)",
     "MRegexReplaceFromLines": "M Regex Replace (picked option)",
+    "MRegexReplaceFromLinesBatch": "M Regex Replace (batch list)",
+    "MSeedAtStep": "M Seed At Step (k)",
 }
 
@@ -0,0 +1,114 @@
+# mthumb.py
+# Downscaled sidecar thumbnails for the preview widget.
+#
+# Derivatives are written once to <cache dir>/thumbs and reused until the
+# source .png changes. The cache dir is MNODES_CACHE_DIR, else mnodes/cache.
+
+import hashlib
+import os
+
+from .mcache import CACHE_DIR, stat_sig
+
+THUMB_DIR = os.path.join(CACHE_DIR, "thumbs")
+
+# requested sizes snap up to one of these, keeps the number of derivatives small
+SIZES = (128, 256, 512, 1024, 2048)
+
+_FMT = None
+
+
+def _format():
+    # (PIL format, ext, content type), webp if this Pillow build has it
+    global _FMT
+    if _FMT is None:
+        from PIL import features
+        if features.check("webp"):
+            _FMT = ("WEBP", "webp", "image/webp")
+        else:
+            _FMT = ("JPEG", "jpg", "image/jpeg")
+    return _FMT
+
+
+def snap_size(size: int) -> int:
+    for s in SIZES:
+        if size <= s:
+            return s
+    return SIZES[-1]
+
+
+def thumb_etag(png_path: str, size: int):
+    """
+    Stat-only ETag for (png, size), None if the png is missing.
+    Cheap enough to answer If-None-Match without touching the image.
+    """
+    try:
+        st = os.stat(png_path)
+    except OSError:
+        return None
+    key = f"{os.path.abspath(png_path)}|{'|'.join(map(str, stat_sig(st)))}|{size}|{_format()[1]}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def to_8bit(im):
+    """im as RGB / RGBA / L, the modes resizing and the encoders take in every Pillow version."""
+    if im.mode in ("RGB", "RGBA", "L"):
+        return im
+    if im.mode.startswith("I;16") or (im.mode == "I" and im.getextrema()[1] > 255):
+        # 16-bit grey (older Pillow opens those pngs as I): scale to 0..255,
+        # a plain convert("L") clips everything above 255 to white
+        return im.convert("I").point(lambda v: v * (1 / 256)).convert("L")
+    if im.mode in ("I", "F"):
+        return im.convert("L")
+    if im.mode in ("LA", "La", "PA", "RGBa") or "transparency" in im.info:
+        return im.convert("RGBA")
+    return im.convert("RGB")  # P, 1, CMYK, YCbCr, ...
+
+
+def _encode(png_path: str, size: int) -> bytes:
+    import io
+    from PIL import Image
+
+    fmt, _, _ = _format()
+    with Image.open(png_path) as im:
+        im.draft("RGB", (size, size))  # no-op for png, cheap decode for jpeg-in-disguise
+        im = to_8bit(im)
+        im.thumbnail((size, size), Image.LANCZOS, reducing_gap=2.0)
+        if fmt == "JPEG":
+            im = im.convert("RGB")
+        elif im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA")
+        kw = {"quality": 85}
+        if fmt == "WEBP":
+            kw["method"] = 4
+        buf = io.BytesIO()
+        im.save(buf, format=fmt, **kw)
+    return buf.getvalue()
+
+
+def thumb_bytes(png_path: str, size: int):
+    """
+    (bytes, content_type, etag) of png_path scaled to fit size x size, or None.
+    Runs blocking disk/PIL work, call it from a worker thread.
+    """
+    etag = thumb_etag(png_path, size)
+    if etag is None:
+        return None
+    _, ext, ctype = _format()
+    out = os.path.join(THUMB_DIR, f"{etag}.{ext}")
+
+    try:
+        with open(out, "rb") as f:
+            return f.read(), ctype, etag
+    except OSError:
+        pass
+
+    data = _encode(png_path, size)
+    try:
+        os.makedirs(THUMB_DIR, exist_ok=True)
+        tmp = f"{out}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, out)
+    except OSError:
+        pass  # read-only cache dir, just serve it uncached
+    return data, ctype, etag
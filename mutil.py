@@ -2,16 +2,17 @@
 # mutil.py
 # Utility nodes for ComfyUI (mnodes)
 
-import os
-import re
+# numpy / torch / PIL / comfy.sd are imported where they are used, loading the pack
+# (and every object_info) must not pay for them
 
-import numpy as np
-import torch
-from PIL import Image
+import os
 
-import folder_paths
-import comfy.sd
-import comfy.utils
+from . import mlist, mmetrics
+from .mcache import ByteLRU, env_mb, file_key
+from .mhash import file_hashes
+from .mlora import DEFAULT_FP16, DEFAULT_LOAD_MODE, LOAD_MODES, apply_loras, load_lora_file, load_lora_files
+from .msidecar import read_sidecar
+from .mthumb import to_8bit
 
 
 def _sidecar_paths(lora_full_path: str):
@@ -19,33 +20,74 @@ def _sidecar_paths(lora_full_path: str):
     return base + ".png", base + ".txt"
 
 
-def _load_thumb_as_image_tensor(png_path: str):
-    # ComfyUI IMAGE tensor: [1, H, W, 3], float32 0..1
-    if not os.path.isfile(png_path):
-        return torch.zeros((1, 64, 64, 3), dtype=torch.float32)
+# shared fallback when there is no .png, never written to
+_EMPTY_THUMB = None
 
-    im = Image.open(png_path).convert("RGB")
-    arr = np.asarray(im).astype(np.float32) / 255.0
-    return torch.from_numpy(arr)[None, ...]
 
+def _empty_thumb():
+    global _EMPTY_THUMB
+    if _EMPTY_THUMB is None:
+        import torch
+        _EMPTY_THUMB = torch.zeros((1, 64, 64, 3), dtype=torch.float32)
+    return _EMPTY_THUMB
 
-def _read_text(path: str):
-    if not os.path.isfile(path):
-        return ""
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        return f.read()
+# decoded IMAGE tensors keyed by (*file_key(png), max_res)
+THUMB_CACHE = ByteLRU(env_mb("MNODES_THUMB_CACHE_MB", 256), sizeof=lambda t: t.numel() * t.element_size())
+mmetrics.register_cache("thumb", THUMB_CACHE)
 
 
-def _guess_weight_from_text(txt: str):
-    # recommendedWeight:"0.7" (your txt format)
-    m = re.search(r'recommendedWeight\s*:\s*"?([0-9]+(?:\.[0-9]+)?)"?', txt, re.I)
-    if m:
-        return float(m.group(1))
-    # <lora:name:0.7> (common prompt format)
-    m = re.search(r"<lora:[^:>]+:([0-9]+(?:\.[0-9]+)?)>", txt, re.I)
-    if m:
-        return float(m.group(1))
-    return None
+def _load_thumb_as_image_tensor(png_path: str, max_res: int = 0):
+    # ComfyUI IMAGE tensor: [1, H, W, 3], float32 0..1
+    # max_res > 0 caps the longest side, decoding at reduced size where PIL can
+    try:
+        key = (*file_key(png_path), int(max_res))
+    except OSError:
+        return _empty_thumb()
+    t = THUMB_CACHE.get(key)
+    if t is not None:
+        return t
+
+    import numpy as np
+    import torch
+    from PIL import Image
+
+    with Image.open(png_path) as im:
+        if max_res > 0 and max(im.size) > max_res:
+            im.draft("RGB", (max_res, max_res))  # jpeg: decode at 1/2..1/8 scale
+        im = to_8bit(im)  # reduce / thumbnail reject P, 1, I;16, ...
+        if max_res > 0 and max(im.size) > max_res:
+            factor = max(im.size) // max_res
+            if factor > 1:
+                im = im.reduce(factor)
+            if max(im.size) > max_res:
+                im.thumbnail((max_res, max_res), Image.BILINEAR)
+        arr = np.array(im.convert("RGB"), dtype=np.uint8)
+
+    mmetrics.inc("mnodes_bytes_read_total", key[1], source="thumb")
+    # one uint8 -> float32 conversion, no extra float64/astype copies
+    t = torch.from_numpy(arr).to(torch.float32).div_(255.0)[None, ...]
+    return THUMB_CACHE.put(key, t)
+
+
+def lora_fingerprint(lora_path: str, content: bool = False) -> str:
+    """
+    size+mtime of the LoRA and its .txt/.png sidecars. content=True adds ctime, inode
+    and sha256 (from the persistent mhash cache so each version of a file is hashed once),
+    for tools that rewrite files and keep the old mtime.
+    Changes exactly when something the loader reads from disk changes.
+    """
+    parts = []
+    for p in (lora_path, *_sidecar_paths(lora_path)):
+        try:
+            _, size, mtime, ctime, ino = file_key(p)
+        except OSError:
+            parts.append("-")
+            continue
+        if content:
+            parts.append(f"{size}:{mtime}:{ctime}:{ino}:{(file_hashes(p) or {}).get('sha256', '')}")
+        else:
+            parts.append(f"{size}:{mtime}")
+    return "|".join(parts)
 
 
 class MGroupInputs:
@@ -126,11 +168,19 @@ class MExtendedLoraLoader:
             "clip": ("CLIP",),
 
             # real dropdown (same idea as Comfy's loader)
-            "lora_name": (folder_paths.get_filename_list("loras"),),
+            "lora_name": (mlist.filename_list("loras"),),
 
             "strength_model": ("FLOAT", {"default": 0.8, "min": -5.0, "max": 5.0, "step": 0.05}),
             "strength_clip": ("FLOAT", {"default": 0.8, "min": -5.0, "max": 5.0, "step": 0.05}),
             "auto_strength_from_meta": ("BOOLEAN", {"default": True}),
+        }, "optional": {
+            # longest side of the thumb output, 0 = original size
+            "thumb_max_res": ("INT", {"default": 0, "min": 0, "max": 8192, "step": 64}),
+            # also hash file contents for IS_CHANGED (for tools that keep mtimes on rewrite)
+            "fingerprint_content": ("BOOLEAN", {"default": False}),
+            # mmap = zero-copy .safetensors views, fp16_cache = fp32 weights cached as fp16
+            "load_mode": (list(LOAD_MODES), {"default": DEFAULT_LOAD_MODE}),
+            "fp16_cache": ("BOOLEAN", {"default": DEFAULT_FP16}),
         }}
 
     RETURN_TYPES = ("MODEL", "CLIP", "IMAGE", "STRING", "STRING", "FLOAT", "FLOAT")
@@ -138,37 +188,123 @@ class MExtendedLoraLoader:
     FUNCTION = "load"
     CATEGORY = "mnodes/util"
 
-    def load(self, model, clip, lora_name, strength_model, strength_clip, auto_strength_from_meta):
-        lora_path = folder_paths.get_full_path("loras", lora_name)
+    @classmethod
+    def IS_CHANGED(cls, lora_name=None, fingerprint_content=False, **kw):
+        # ComfyUI reruns the node when this value changes, widgets are compared separately.
+        # Linked lora_name isn't passed here, then only the inputs decide.
+        if not isinstance(lora_name, str):
+            return ""
+        lora_path = mlist.full_path("loras", lora_name)
+        if lora_path is None:
+            return ""
+        return lora_fingerprint(lora_path, fingerprint_content)
+
+    def load(self, model, clip, lora_name, strength_model, strength_clip, auto_strength_from_meta,
+             thumb_max_res=0, fingerprint_content=False, load_mode=None, fp16_cache=None):
+        lora_path = mlist.full_path("loras", lora_name)
         if lora_path is None or not os.path.isfile(lora_path):
             raise FileNotFoundError(f"LoRA not found: {lora_name}")
 
         thumb_path, meta_path = _sidecar_paths(lora_path)
-        meta_text = _read_text(meta_path)
-        thumb = _load_thumb_as_image_tensor(thumb_path)
-
-        if auto_strength_from_meta and meta_text:
-            w = _guess_weight_from_text(meta_text)
-            if w is not None:
-                strength_model = w
-                strength_clip = w
-
-        lora = comfy.utils.load_torch_file(lora_path, safe_load=True)
-        model_lora, clip_lora = comfy.sd.load_lora_for_models(
-            model, clip, lora, strength_model, strength_clip
-        )
+        with mmetrics.timed("mnodes_lora_load_phase_seconds", phase="sidecar"):
+            sidecar = read_sidecar(meta_path)
+        # header only, the description block is never read here
+        meta_text = sidecar.header if sidecar is not None else ""
+        with mmetrics.timed("mnodes_lora_load_phase_seconds", phase="thumb"):
+            thumb = _load_thumb_as_image_tensor(thumb_path, thumb_max_res)
+
+        if auto_strength_from_meta and sidecar is not None and sidecar.recommended_weight is not None:
+            strength_model = sidecar.recommended_weight
+            strength_clip = sidecar.recommended_weight
+
+        import comfy.sd
+        with mmetrics.timed("mnodes_lora_load_phase_seconds", phase="disk"):
+            lora = load_lora_file(lora_path, load_mode, fp16_cache)
+        with mmetrics.timed("mnodes_lora_load_phase_seconds", phase="patch"):
+            model_lora, clip_lora = comfy.sd.load_lora_for_models(
+                model, clip, lora, strength_model, strength_clip
+            )
 
         ui = {"text": [meta_text if meta_text else "(no .txt sidecar)"]}
         return {"ui": ui, "result": (model_lora, clip_lora, thumb, meta_text, lora_name, strength_model, strength_clip)}
 
 
+STACK_SLOTS = 5
+
+
+class MStackedLoraLoader:
+    """
+    Up to 5 LoRAs in one node (same slots as M Group Inputs).
+    Empty ("None") and zero-strength slots are skipped. Files load in parallel and all
+    LoRAs are patched onto a single model/clip clone.
+
+    Outputs model, clip, the combined sidecar headers and the effective strength per LoRA
+    ("name: strength" lines, after auto_strength_from_meta).
+    """
+    @classmethod
+    def INPUT_TYPES(cls):
+        loras = ["None"] + mlist.filename_list("loras")
+        req = {
+            "model": ("MODEL",),
+            "clip": ("CLIP",),
+            "auto_strength_from_meta": ("BOOLEAN", {"default": False}),
+        }
+        for i in range(1, STACK_SLOTS + 1):
+            req[f"lora{i}"] = (loras,)
+            req[f"lora{i}_strength"] = ("FLOAT", {"default": 1.0, "min": -10.0, "max": 10.0, "step": 0.05})
+        return {"required": req}
+
+    RETURN_TYPES = ("MODEL", "CLIP", "STRING", "STRING")
+    RETURN_NAMES = ("model", "clip", "meta_text", "strengths")
+    FUNCTION = "load"
+    CATEGORY = "mnodes/util"
+
+    @classmethod
+    def IS_CHANGED(cls, **kw):
+        parts = []
+        for i in range(1, STACK_SLOTS + 1):
+            name = kw.get(f"lora{i}")
+            path = mlist.full_path("loras", name) if isinstance(name, str) and name != "None" else None
+            parts.append(lora_fingerprint(path) if path else "")
+        return "||".join(parts)
+
+    def load(self, model, clip, auto_strength_from_meta, **kw):
+        slots = []
+        for i in range(1, STACK_SLOTS + 1):
+            name, strength = kw.get(f"lora{i}", "None"), float(kw.get(f"lora{i}_strength", 0.0))
+            if not name or name == "None" or strength == 0.0:
+                continue
+            lora_path = mlist.full_path("loras", name)
+            if lora_path is None or not os.path.isfile(lora_path):
+                raise FileNotFoundError(f"LoRA not found: {name}")
+            sidecar = read_sidecar(_sidecar_paths(lora_path)[1])
+            if auto_strength_from_meta and sidecar is not None and sidecar.recommended_weight is not None:
+                strength = sidecar.recommended_weight
+            slots.append((name, lora_path, strength, sidecar))
+
+        if not slots:
+            return (model, clip, "", "")
+
+        with mmetrics.timed("mnodes_lora_load_phase_seconds", phase="disk"):
+            sds = load_lora_files([s[1] for s in slots])
+        with mmetrics.timed("mnodes_lora_load_phase_seconds", phase="patch"):
+            model_lora, clip_lora = apply_loras(model, clip, [(sd, s[2], s[2]) for sd, s in zip(sds, slots)])
+
+        meta_text = "\n\n".join(f"== {name} ==\n{sc.header if sc is not None else '(no .txt sidecar)'}"
+                                 for name, _, _, sc in slots)
+        strengths = "\n".join(f"{name}: {strength:g}" for name, _, strength, _ in slots)
+        return {"ui": {"text": [strengths]}, "result": (model_lora, clip_lora, meta_text, strengths)}
+
+
 NODE_CLASS_MAPPINGS = {
     "MGroupInputs": MGroupInputs,
     "MExtendedLoraLoader": MExtendedLoraLoader,
+    "MStackedLoraLoader": MStackedLoraLoader,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "MGroupInputs": "M Group Inputs",
     "MExtendedLoraLoader": "M Extended LoRA Loader (thumb+meta)",
+    "MStackedLoraLoader": "M Stacked LoRA Loader (x5)",
 }
 
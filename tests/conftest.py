@@ -0,0 +1,21 @@
+# conftest.py
+# The pack dir is importable as package "mnodes" without running __init__.py
+# (that one needs ComfyUI), so the plain modules can be tested on their own:
+#   from mnodes import mstring
+# Modules that import folder_paths / comfy.* get bench/stubs, on-disk caches go to a temp dir.
+
+import os
+import sys
+import tempfile
+import types
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("MNODES_BENCH_ROOT", tempfile.mkdtemp(prefix="mnodes-test-"))
+os.environ.setdefault("MNODES_CACHE_DIR", os.path.join(os.environ["MNODES_BENCH_ROOT"], "cache"))
+sys.path.append(os.path.join(REPO_DIR, "bench", "stubs"))
+
+if "mnodes" not in sys.modules:
+    _pack = types.ModuleType("mnodes")
+    _pack.__path__ = [REPO_DIR]
+    sys.modules["mnodes"] = _pack
@@ -0,0 +1,41 @@
+from mnodes import mfold
+from mnodes.mint import NODE_CLASS_MAPPINGS as MINT
+from mnodes.mod import NODE_CLASS_MAPPINGS as MOD
+
+CLASSES = {**MINT, **MOD, "Sink": type("Sink", (), {
+    "INPUT_TYPES": classmethod(lambda cls: {"required": {"x": ("INT", {"min": 0, "max": 4096})}}),
+})}
+
+
+def sink(src):
+    return {"class_type": "Sink", "inputs": {"x": [src, 0]}}
+
+
+def test_folds_constant_chain():
+    prompt = {
+        "1": {"class_type": "MIntAdd", "inputs": {"a": 3, "b": 4}},
+        "2": {"class_type": "IntModulo", "inputs": {"a": ["1", 0], "b": 5}},
+        "3": sink("2"),
+    }
+    assert mfold.fold_prompt(prompt, CLASSES) == 2
+    assert prompt == {"3": {"class_type": "Sink", "inputs": {"x": 2}}}
+
+
+def test_own_widget_values_are_validated_first():
+    # out of the widget range, a float for an INT, unknown input: validation's call, not ours
+    for inputs in ({"a": 2**40, "b": 1}, {"a": 1.5, "b": 1}, {"a": 1, "b": 1, "zz": 0}):
+        prompt = {"1": {"class_type": "MIntAdd", "inputs": inputs}, "2": sink("1")}
+        assert mfold.fold_prompt(prompt, CLASSES) == 0
+        assert prompt["2"]["inputs"]["x"] == ["1", 0]
+
+
+def test_runaway_expr_is_left_to_the_executor():
+    prompt = {"1": {"class_type": "MIntExpr", "inputs": {"expr": "(((a**62)**62)**62)**62", "a": 3}},
+              "2": sink("1")}
+    assert mfold.fold_prompt(prompt, CLASSES) == 0
+    assert "1" in prompt
+
+
+def test_deadline_stops_evaluating():
+    prompt = {"1": {"class_type": "MIntAdd", "inputs": {"a": 3, "b": 4}}, "2": sink("1")}
+    assert mfold.fold_prompt(prompt, CLASSES, deadline=0.0) == 0
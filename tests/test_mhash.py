@@ -0,0 +1,38 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+from mnodes import mhash
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_rewrite_with_mtime_kept_is_rehashed(tmp_path):
+    p, db = str(tmp_path / "a.safetensors"), str(tmp_path / "hashes.sqlite")
+    write(p, b"old!")
+    assert mhash.file_hashes(p, db)["sha256"] == hashlib.sha256(b"old!").hexdigest()
+
+    st = os.stat(p)
+    time.sleep(0.05)  # ctime ticks are coarse
+    write(p, b"new!")
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert mhash.file_hashes(p, db)["sha256"] == hashlib.sha256(b"new!").hexdigest()
+
+    # and from the sqlite file, as after a restart
+    fresh = mhash.HashCache(db)
+    assert fresh.get(os.path.abspath(p), mhash.stat_sig(os.stat(p)))["sha256"] == hashlib.sha256(b"new!").hexdigest()
+
+
+def test_old_rows_without_ctime_are_dropped(tmp_path):
+    db = str(tmp_path / "hashes.sqlite")
+    with sqlite3.connect(db) as c:
+        c.execute("CREATE TABLE hashes (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER,"
+                  " sha256 TEXT, autov2 TEXT, blake3 TEXT)")
+        c.execute("INSERT INTO hashes VALUES ('/x', 1, 1, 'stale', 'STALE', '')")
+    c.close()
+    cache = mhash.HashCache(db)
+    assert cache._db.execute("SELECT COUNT(*) FROM hashes").fetchone()[0] == 0
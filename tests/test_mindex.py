@@ -0,0 +1,42 @@
+import os
+import sqlite3
+
+from mnodes.mindex import LoraIndex
+
+
+def write(path, data=b""):
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def has_thumb(idx, entries):
+    idx.refresh(entries, force=True)
+    return idx.query()["items"][0]["has_thumb"]
+
+
+def test_png_added_or_removed_next_to_untouched_txt(tmp_path):
+    lora = write(str(tmp_path / "a.safetensors"))
+    write(str(tmp_path / "a.txt"), b'modelName:"a"\n')
+    idx = LoraIndex(str(tmp_path / "index.sqlite"))
+    entries = [("a.safetensors", lora)]
+
+    assert has_thumb(idx, entries) is False
+    write(str(tmp_path / "a.png"), b"png")
+    assert has_thumb(idx, entries) is True
+    assert idx.refresh(entries, force=True) == 0  # nothing changed, nothing re-parsed
+    os.remove(str(tmp_path / "a.png"))
+    assert has_thumb(idx, entries) is False
+
+
+def test_old_schema_is_rebuilt(tmp_path):
+    db = str(tmp_path / "index.sqlite")
+    with sqlite3.connect(db) as c:
+        c.execute("CREATE TABLE loras (name TEXT PRIMARY KEY, path TEXT NOT NULL, txt_size INTEGER,"
+                  " txt_mtime_ns INTEGER, has_thumb INTEGER NOT NULL DEFAULT 0)")
+        c.execute("INSERT INTO loras VALUES ('gone.safetensors', '/nope', 1, 1, 1)")
+    c.close()
+    lora = write(str(tmp_path / "a.safetensors"))
+    idx = LoraIndex(db)
+    assert idx.refresh([("a.safetensors", lora)], force=True) == 1
+    assert [it["name"] for it in idx.query()["items"]] == ["a.safetensors"]
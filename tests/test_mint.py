@@ -0,0 +1,22 @@
+import pytest
+
+from mnodes.mint import IntExpr, compile_int_expr
+
+ENV = dict(a=1000, b=7, c=0, d=0, e=0, f=0)
+
+
+def test_expr_matches_nodes():
+    assert compile_int_expr("clamp((a // 8) * 8 + b, 64, 4096)")(ENV) == 1007
+    assert compile_int_expr("a / 0 + a % 0 + b ** -1")(ENV) == 0
+    assert compile_int_expr("2 ** 62 * 3")(ENV) == 3 * 2**62
+
+
+@pytest.mark.parametrize("src", [
+    "(((a**62)**62)**62)**62",
+    "a ** 62",
+    "(a * a) * (a * a) * (a * a) * (a * a) * a * a * a",
+    "2 ** 62 * 2 ** 62",
+])
+def test_expr_rejects_results_past_64_bits(src):
+    with pytest.raises(ValueError, match="64 bits"):
+        IntExpr().go(src, **ENV)
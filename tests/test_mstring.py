@@ -0,0 +1,31 @@
+import pytest
+
+from mnodes.mstring import MRegexReplaceFromLines, MRegexReplaceFromLinesBatch
+
+ARGS = dict(text="a SKIN b", pattern="SKIN", case_insensitive=False, multiline=False, dotall=True,
+            max_replacements=0)
+
+
+def batch(n, count, options, stepping):
+    listed = {k: [v] for k, v in ARGS.items()}
+    return MRegexReplaceFromLinesBatch().go(n=n, count=[count], options=[options], stepping=[stepping], **listed)
+
+
+def test_batch_chain_matches_chained_single_nodes():
+    n = 12345
+    want = []
+    for _ in range(5):
+        want.append(MRegexReplaceFromLines().go(n=n, options="pink\ngreen\nblue\n", **ARGS))
+        n = want[-1][0]
+    got = batch([12345], 5, "pink\ngreen\nblue\n", "chain")
+    assert list(zip(*got)) == want
+
+
+@pytest.mark.parametrize("stepping", ["chain", "counter"])
+@pytest.mark.parametrize("options", ["", "\n  \n"])
+def test_batch_empty_options_passes_n_through(stepping, options):
+    single = MRegexReplaceFromLines().go(n=7, options=options, **ARGS)
+    assert single == (7, "a SKIN b", "", 0)
+
+    assert batch([7], 3, options, stepping) == ([7] * 3, ["a SKIN b"] * 3, [""] * 3, [0] * 3)
+    assert batch([7, 8, 9], 3, options, stepping) == ([7, 8, 9], ["a SKIN b"] * 3, [""] * 3, [0] * 3)
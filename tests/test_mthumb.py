@@ -0,0 +1,31 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from mnodes import mthumb
+
+
+def write_png(path, mode):
+    if mode == "I;16":
+        im = Image.fromarray((np.arange(600 * 400).reshape(400, 600) % 65536).astype(np.uint16))
+    else:
+        im = Image.new("RGB", (600, 400), (200, 30, 30)).convert(mode)
+    im.save(path)
+    return path
+
+
+@pytest.mark.parametrize("mode", ["P", "1", "LA", "I;16", "RGBA"])
+def test_encode_any_png_mode(tmp_path, mode):
+    data = mthumb._encode(write_png(str(tmp_path / "a.png"), mode), 128)
+    with Image.open(io.BytesIO(data)) as im:
+        assert max(im.size) == 128
+        assert im.mode in ("RGB", "RGBA", "L")
+
+
+def test_16bit_is_scaled_not_clipped():
+    im = Image.fromarray(np.full((8, 8), 32768, dtype=np.uint16))
+    assert np.array(mthumb.to_8bit(im)).max() == 128
+    # older Pillow opens 16-bit grey pngs as I
+    assert np.array(mthumb.to_8bit(im.convert("I"))).max() == 128
@@ -0,0 +1,65 @@
+import os
+import struct
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import folder_paths
+from comfy.model_patcher import CLIP, ModelPatcher
+from mnodes import mutil
+
+LORA_DIR = folder_paths.get_folder_paths("loras")[0]
+
+
+def write_lora(name):
+    # empty .safetensors: 8 byte header length + "{}" padded to 8 bytes
+    path = os.path.join(LORA_DIR, name)
+    os.makedirs(LORA_DIR, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", 8) + b"{}      ")
+    return path
+
+
+def write_png(path, mode, size=(700, 500)):
+    if mode == "I;16":
+        im = Image.fromarray(np.linspace(0, 65535, size[0] * size[1]).astype(np.uint16).reshape(size[::-1]))
+    else:
+        im = Image.new("RGB", size, (200, 30, 30)).convert(mode)
+    im.save(path)
+
+
+@pytest.mark.parametrize("mode", ["P", "1", "I;16", "LA", "RGB"])
+def test_loader_thumb_any_png_mode(mode):
+    name = f"thumb_{mode.replace(';', '')}.safetensors"
+    write_png(write_lora(name)[:-len(".safetensors")] + ".png", mode)
+    out = mutil.MExtendedLoraLoader().load(ModelPatcher([]), CLIP([]), name, 1.0, 1.0, False, thumb_max_res=256)
+    thumb = out["result"][2]
+    assert thumb.shape[0] == 1 and thumb.shape[2] == 256 and thumb.shape[3] == 3
+    assert thumb.dtype.is_floating_point and 0.0 <= float(thumb.min()) <= float(thumb.max()) <= 1.0
+
+
+def rewrite_keep_mtime(path, data):
+    # same size, old mtime put back, like rsync -t or a sync client
+    st = os.stat(path)
+    time.sleep(0.05)  # ctime ticks are coarse
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def test_rewrite_with_mtime_kept():
+    name = "rewrite.safetensors"
+    lora = write_lora(name)
+    txt = lora[:-len(".safetensors")] + ".txt"
+    with open(txt, "wb") as f:
+        f.write(b'modelName:"old"\n')
+    node = mutil.MExtendedLoraLoader()
+
+    before = mutil.MExtendedLoraLoader.IS_CHANGED(name, fingerprint_content=True)
+    assert node.load(ModelPatcher([]), CLIP([]), name, 1.0, 1.0, False)["result"][3] == 'modelName:"old"'
+
+    rewrite_keep_mtime(txt, b'modelName:"new"\n')
+    assert mutil.MExtendedLoraLoader.IS_CHANGED(name, fingerprint_content=True) != before
+    assert node.load(ModelPatcher([]), CLIP([]), name, 1.0, 1.0, False)["result"][3] == 'modelName:"new"'
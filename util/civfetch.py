@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# civfetch.py
+# Python/asyncio replacement for running fileToCiv.sh + civs.sh over a whole lora folder.
+#
+#   python util/civfetch.py [options] <lora files or dirs>...
+#
+# Writes the same <base>.txt / <base>.png sidecars as civs.sh, but:
+# - hashes come from ../mhash.py (parallel, cached across runs)
+# - all API calls share one pooled HTTP client, bounded by --concurrency and --rate (req/s)
+# - API responses are cached on disk (--cache-dir, --cache-ttl), a rerun or resumed run
+#   only hits the network for what is missing or stale
+# - loras whose .txt/.png are newer than the lora file are skipped (--force to redo)
+# - thumbnails are converted to png with PIL in a process pool (ffmpeg fallback for video)
+#
+# --api-base points it at any server speaking the same API (see util/civstub.py for a local stub).
+# Deps: aiohttp, pillow (both ship with ComfyUI). Env: CIVITAI_API_KEY (optional).
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import mhash  # noqa: E402
+
+DEFAULT_API = "https://civitai.com/api/v1"
+DEFAULT_SITE = "https://civitai.com"
+LORA_TAG_RE = re.compile(r"<lora:[^:>]+:[0-9]+(?:\.[0-9]+)?>")
+
+
+# ---- jq helpers from civs.sh (S / SARR / J / `// ""`) ----
+
+def _tojson(v):
+    return json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+
+
+def S(v):
+    if v is None:
+        return ""
+    if isinstance(v, str):
+        return v
+    if isinstance(v, (bool, int, float)):
+        return _tojson(v)
+    if isinstance(v, list):
+        return ", ".join(S(x) for x in v)
+    return _tojson(v)
+
+
+def SARR(v):
+    if v is None:
+        return ""
+    if isinstance(v, list):
+        return ", ".join(x if isinstance(x, str) else _tojson(x) for x in v)
+    if isinstance(v, str):
+        return v
+    return _tojson(v)
+
+
+def J(v):
+    return "{}" if v is None else _tojson(v)
+
+
+def ALT(v):
+    # jq `.x // ""`: null and false fall through
+    if v is None or v is False:
+        return ""
+    return v if isinstance(v, str) else _tojson(v)
+
+
+def dig(d, *path):
+    for k in path:
+        if isinstance(d, dict):
+            d = d.get(k)
+        elif isinstance(d, list) and isinstance(k, int) and -len(d) <= k < len(d):
+            d = d[k]
+        else:
+            return None
+    return d
+
+
+# ---- HTTP: pooled client, concurrency + rate limit, on-disk response cache ----
+
+class RateLimiter:
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            t = max(now, self._next)
+            self._next = t + self.interval
+        if t > now:
+            await asyncio.sleep(t - now)
+
+
+class Api:
+    def __init__(self, session, api_base, cache_dir, ttl_s, concurrency, rate, retries=3):
+        self.session = session
+        self.api_base = api_base.rstrip("/")
+        self.cache_dir = cache_dir
+        self.ttl_s = ttl_s
+        self.sem = asyncio.Semaphore(concurrency)
+        self.rate = RateLimiter(rate)
+        self.retries = retries
+        self.stats = {"requests": 0, "cache_hits": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    async def _request(self, url, raw=False):
+        delay = 1.0
+        for attempt in range(self.retries + 1):
+            async with self.sem:
+                await self.rate.wait()
+                self.stats["requests"] += 1
+                async with self.session.get(url) as r:
+                    if r.status == 429 or r.status >= 500:
+                        retry_after = r.headers.get("Retry-After", "")
+                        wait = float(retry_after) if retry_after.isdigit() else delay
+                    else:
+                        body = await (r.read() if raw else r.text())
+                        return r.status, body
+            if attempt == self.retries:
+                break
+            await asyncio.sleep(wait)
+            delay *= 2
+        return r.status, b"" if raw else ""
+
+    async def get_json(self, path):
+        """(status, parsed json or None), 200 and 404 answers are cached for ttl."""
+        url = self.api_base + path
+        cp = self._cache_path(url)
+        try:
+            if time.time() - os.path.getmtime(cp) < self.ttl_s:
+                with open(cp, "r", encoding="utf-8") as f:
+                    hit = json.load(f)
+                self.stats["cache_hits"] += 1
+                return hit["status"], hit["body"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        status, text = await self._request(url)
+        try:
+            body = json.loads(text) if status == 200 else None
+        except ValueError:
+            status, body = 502, None
+        if status in (200, 404):
+            _atomic_write(cp, json.dumps({"url": url, "status": status, "body": body}).encode("utf-8"))
+        return status, body
+
+    async def get_bytes(self, url):
+        status, data = await self._request(url, raw=True)
+        return data if status == 200 else None
+
+
+# ---- files ----
+
+def _atomic_write(path, data: bytes):
+    d = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".civfetch-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def to_png(data: bytes, png_path: str):
+    """First frame of any image PIL can read -> png, ffmpeg for anything else (video previews)."""
+    try:
+        from PIL import Image
+        with Image.open(io.BytesIO(data)) as im:
+            im.seek(0)
+            im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+            buf = io.BytesIO()
+            im.save(buf, format="PNG")
+        _atomic_write(png_path, buf.getvalue())
+        return
+    except Exception:
+        if shutil.which("ffmpeg") is None:
+            raise
+    with tempfile.NamedTemporaryFile(suffix=".bin") as src:
+        src.write(data)
+        src.flush()
+        tmp = png_path + ".tmp.png"
+        subprocess.run(["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", src.name,
+                        "-frames:v", "1", tmp], check=True)
+        os.replace(tmp, png_path)
+
+
+def is_fresh(lora_path):
+    base = os.path.splitext(lora_path)[0]
+    try:
+        lm = os.path.getmtime(lora_path)
+        return os.path.getmtime(base + ".txt") >= lm and os.path.getmtime(base + ".png") >= lm
+    except OSError:
+        return False
+
+
+def render_meta(url, mv_id, mv, model, img, thumb_url, site) -> str:
+    """Same layout and fields as civs.sh."""
+    item = dig(img, "items", 0, "meta")
+    ex_prompt = S(dig(item, "prompt"))
+    tags_found = LORA_TAG_RE.findall(ex_prompt)
+    example_lora_tags = " ".join(tags_found)
+    recommended_weight = tags_found[0].rsplit(":", 1)[1][:-1] if len(tags_found) == 1 else ""
+
+    files = (mv or {}).get("files") or []
+    primary = next((f for f in files if isinstance(f, dict) and f.get("primary") is True), None)
+
+    def file_field(*path):
+        v = dig(primary, *path) if primary is not None else None
+        if v is None or v is False:
+            v = dig(files, 0, *path)
+        return ALT(v)
+
+    download_url = file_field("downloadUrl") or ALT(dig(mv, "downloadUrl"))
+    model_id = ALT(dig(mv, "modelId"))
+    creator_user = S(dig(model, "creator", "username"))
+
+    lines = [
+        'trigger:""                      # optional: your preferred single trigger',
+        f'trainedWords:"{SARR(dig(mv, "trainedWords"))}"   # civitai triggers',
+        f'baseModel:"{S(dig(mv, "baseModel"))}"',
+        "",
+        f'recommendedWeight:"{recommended_weight}"     # best-effort: from example prompt <lora:...:X>',
+        f'exampleLoraTags:"{example_lora_tags}"',
+        "",
+        f'examplePrompt:"{ex_prompt}"',
+        f'exampleNegativePrompt:"{S(dig(item, "negativePrompt"))}"',
+        f'exampleSampler:"{S(dig(item, "sampler"))}"',
+        f'exampleSteps:"{S(dig(item, "steps"))}"',
+        f'exampleCfgScale:"{S(dig(item, "cfgScale"))}"',
+        f'exampleSeed:"{S(dig(item, "seed"))}"',
+        f'exampleSize:"{S(dig(item, "Size"))}"',
+        f"exampleMetaJson:{J(item)}",
+        "",
+        f'CivUrl:"{url}"',
+        f'modelPage:"{site}/models/{model_id}"',
+        f'modelVersionPage:"{site}/models/{model_id}?modelVersionId={mv_id}"',
+        "",
+        f'modelName:"{S(dig(model, "name"))}"',
+        f'modelType:"{S(dig(model, "type"))}"',
+        f'tags:"{S(dig(model, "tags"))}"',
+        "",
+        f'creatorUsername:"{creator_user}"',
+        f'creatorImage:"{S(dig(model, "creator", "image"))}"',
+        f'creatorModelsApi:"{site}/api/v1/models?username={creator_user}"',
+        "",
+        f'modelId:"{model_id}"',
+        f'modelVersionId:"{mv_id}"',
+        "",
+    ]
+    for key, src, field in (
+        ("modelDownloadCount", model, "downloadCount"), ("modelFavoriteCount", model, "favoriteCount"),
+        ("modelThumbsUp", model, "thumbsUpCount"), ("modelThumbsDown", model, "thumbsDownCount"),
+        ("modelRating", model, "rating"), ("modelRatingCount", model, "ratingCount"),
+        ("modelCommentCount", model, "commentCount"), (None, None, None),
+        ("versionDownloadCount", mv, "downloadCount"), ("versionThumbsUp", mv, "thumbsUpCount"),
+        ("versionThumbsDown", mv, "thumbsDownCount"), ("versionRating", mv, "rating"),
+        ("versionRatingCount", mv, "ratingCount"), (None, None, None),
+    ):
+        lines.append("" if key is None else f'{key}:"{ALT(dig(src, "stats", field))}"')
+    lines += [
+        f'allowNoCredit:"{ALT(dig(model, "allowNoCredit"))}"',
+        f'allowDerivatives:"{ALT(dig(model, "allowDerivatives"))}"',
+        f'allowDifferentLicense:"{ALT(dig(model, "allowDifferentLicense"))}"',
+        f'allowCommercialUse:"{S(dig(model, "allowCommercialUse"))}"',
+        "",
+        f'fileName:"{file_field("name")}"',
+        f'fileSizeKB:"{file_field("sizeKB")}"',
+        f'downloadUrl:"{download_url}"',
+        f'hashAutoV2:"{file_field("hashes", "AutoV2")}"',
+        f'hashSHA256:"{file_field("hashes", "SHA256")}"',
+        f'hashBLAKE3:"{file_field("hashes", "BLAKE3")}"',
+        "",
+        f'thumbnailUrl:"{thumb_url}"',
+        f'createdAt:"{S(dig(mv, "createdAt"))}"',
+        f'publishedAt:"{S(dig(mv, "publishedAt"))}"',
+        "",
+        "--- modelDescription ---",
+        S(dig(model, "description")),
+        "--- versionDescription ---",
+        S(dig(mv, "description")),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+# ---- pipeline ----
+
+async def process_one(api, pool, lora, hashes, site, log):
+    rec = hashes.get(os.path.abspath(lora))
+    if rec is None:
+        log(f"cannot read: {lora}")
+        return "error"
+
+    mv = None
+    for h in (rec["sha256"], rec["blake3"]):
+        if not h:
+            continue
+        status, body = await api.get_json(f"/model-versions/by-hash/{h}")
+        if status == 200 and isinstance(body, dict) and body.get("id"):
+            mv = body
+            break
+    if mv is None:
+        log(f"no civitai match for: {lora}")
+        return "nomatch"
+
+    mv_id = mv["id"]
+    status, mv_full = await api.get_json(f"/model-versions/{mv_id}")
+    mv = mv_full if status == 200 and isinstance(mv_full, dict) else mv
+    model_id = mv.get("modelId")
+    if not model_id:
+        log(f"no modelId in model-version payload (mv_id={mv_id})")
+        return "error"
+
+    (_, model), (_, img) = await asyncio.gather(
+        api.get_json(f"/models/{model_id}"),
+        api.get_json(f"/images?modelVersionId={mv_id}&limit=1"),
+    )
+
+    thumb_url = ALT(dig(mv, "images", 0, "url")) or ALT(dig(img, "items", 0, "url"))
+    if not thumb_url:
+        log(f"no thumbnail url found: {lora}")
+        return "error"
+
+    base = os.path.splitext(lora)[0]
+    data = await api.get_bytes(thumb_url)
+    if data is None:
+        log(f"thumbnail download failed: {thumb_url}")
+        return "error"
+    try:
+        await asyncio.get_running_loop().run_in_executor(pool, to_png, data, base + ".png")
+    except Exception as e:
+        log(f"thumbnail conversion failed for {lora}: {e}")
+        return "error"
+
+    url = f"{site}/?modelVersionId={mv_id}"
+    meta = render_meta(url, mv_id, mv, model or {}, img or {}, thumb_url, site)
+    _atomic_write(base + ".txt", meta.encode("utf-8"))
+    log(f"wrote: {base}.png")
+    log(f"wrote: {base}.txt")
+    return "ok"
+
+
+async def run(args) -> dict:
+    loras = [p for p in mhash._expand(args.paths) if os.path.isfile(p)]
+    todo = loras if args.force else [p for p in loras if not is_fresh(p)]
+    counts = {"total": len(loras), "skipped": len(loras) - len(todo)}
+    if not todo:
+        return counts
+
+    def log(msg):
+        print(msg, file=sys.stderr, flush=True)
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=args.workers or None) as pool:
+        # hashing is cached by (path, size, mtime), only new/changed files are read
+        hashes = await loop.run_in_executor(None, lambda: mhash.hash_files(todo, workers=args.workers))
+
+        headers = {"User-Agent": "mnodes-civfetch"}
+        if os.environ.get("CIVITAI_API_KEY"):
+            headers["Authorization"] = f"Bearer {os.environ['CIVITAI_API_KEY']}"
+        conn = aiohttp.TCPConnector(limit=args.concurrency)
+        timeout = aiohttp.ClientTimeout(total=args.timeout)
+        async with aiohttp.ClientSession(connector=conn, headers=headers, timeout=timeout) as session:
+            api = Api(session, args.api_base, args.cache_dir, args.cache_ttl * 3600, args.concurrency, args.rate)
+
+            async def guarded(p):
+                try:
+                    return await process_one(api, pool, p, hashes, args.site_base.rstrip("/"), log)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    log(f"network error for {p}: {e!r}")
+                    return "error"
+
+            for res in await asyncio.gather(*(guarded(p) for p in todo)):
+                counts[res] = counts.get(res, 0) + 1
+            counts.update(api.stats)
+    return counts
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="fetch civitai sidecars (.txt/.png) for lora files, concurrently")
+    ap.add_argument("paths", nargs="+", help="lora files, or dirs to scan")
+    ap.add_argument("--api-base", default=DEFAULT_API)
+    ap.add_argument("--site-base", default=DEFAULT_SITE, help="used for the page urls written to the .txt")
+    ap.add_argument("--concurrency", type=int, default=4, help="max requests in flight")
+    ap.add_argument("--rate", type=float, default=4.0, help="max requests per second, 0 = unlimited")
+    ap.add_argument("--timeout", type=float, default=60.0, help="per request, seconds")
+    ap.add_argument("--cache-dir", default=os.path.join(mhash.CACHE_DIR, "civitai"))
+    ap.add_argument("--cache-ttl", type=float, default=24 * 7, help="hours an api response stays fresh")
+    ap.add_argument("--workers", type=int, default=0, help="hash / image conversion processes")
+    ap.add_argument("--force", action="store_true", help="refetch even if the sidecars are newer than the lora")
+    args = ap.parse_args(argv)
+
+    counts = asyncio.run(run(args))
+    print(json.dumps(counts), file=sys.stderr)
+    return 1 if counts.get("error") or counts.get("nomatch") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
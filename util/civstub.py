@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# civstub.py
+# Local stand-in for the parts of the Civitai API that civs.sh / civfetch.py use,
+# so the fetch pipeline can be run and timed offline.
+#
+#   python util/civstub.py [--port 8765] [--latency-ms 50] [--throttle-every 0] <lora files or dirs>...
+#   python util/civfetch.py --api-base http://127.0.0.1:8765/api/v1 <same loras>
+#
+# Every given file gets a fake model + version, found by its sha256 (or blake3).
+# GET /stats returns request counts per endpoint.
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+from collections import Counter
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import mhash  # noqa: E402
+
+
+def _jpeg(seed: int) -> bytes:
+    from PIL import Image
+    im = Image.new("RGB", (768, 1024), ((seed * 53) % 256, (seed * 97) % 256, (seed * 29) % 256))
+    buf = io.BytesIO()
+    im.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def build_fixtures(paths, base_url):
+    hashes = mhash.hash_files(paths)
+    by_hash, versions, models = {}, {}, {}
+    for i, (path, rec) in enumerate(sorted(hashes.items()), start=1):
+        name = os.path.splitext(os.path.basename(path))[0]
+        mv_id, model_id = 1000 + i, 500 + i
+        mv = {
+            "id": mv_id, "modelId": model_id, "name": "v1.0",
+            "baseModel": "SDXL 1.0", "trainedWords": [f"{name}_trigger", "style"],
+            "createdAt": "2024-01-01T00:00:00.000Z", "publishedAt": "2024-01-02T00:00:00.000Z",
+            "description": f"<p>version notes for {name}</p>" * 50,
+            "stats": {"downloadCount": 10 * i, "thumbsUpCount": i, "thumbsDownCount": 0, "rating": 5, "ratingCount": i},
+            "images": [{"url": f"{base_url}/img/{mv_id}.jpg"}],
+            "files": [{"name": os.path.basename(path), "primary": True, "sizeKB": os.path.getsize(path) / 1024,
+                       "downloadUrl": f"{base_url}/download/{mv_id}",
+                       "hashes": {"AutoV2": rec["autov2"], "SHA256": rec["sha256"].upper(),
+                                  "BLAKE3": rec["blake3"].upper()}}],
+        }
+        model = {
+            "id": model_id, "name": f"{name} model", "type": "LORA", "tags": ["style", "test"],
+            "description": f"<p>model description for {name}</p>" * 200,
+            "creator": {"username": "stub", "image": None},
+            "stats": {"downloadCount": 100 * i, "favoriteCount": i, "thumbsUpCount": i, "thumbsDownCount": 0,
+                      "rating": 4.5, "ratingCount": i, "commentCount": 0},
+            "allowNoCredit": True, "allowDerivatives": True, "allowDifferentLicense": False,
+            "allowCommercialUse": ["Image", "Rent"],
+        }
+        versions[mv_id] = mv
+        models[model_id] = model
+        for h in (rec["sha256"], rec["blake3"]):
+            if h:
+                by_hash[h.lower()] = mv
+    return by_hash, versions, models
+
+
+def make_app(by_hash, versions, models, latency_ms=0, throttle_every=0):
+    hits = Counter()
+
+    async def pace(kind):
+        hits[kind] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if throttle_every and sum(hits.values()) % throttle_every == 0:
+            raise web.HTTPTooManyRequests(headers={"Retry-After": "1"})
+
+    async def by_hash_h(request):
+        await pace("by-hash")
+        mv = by_hash.get(request.match_info["h"].lower())
+        return web.json_response(mv) if mv else web.json_response({"error": "not found"}, status=404)
+
+    async def version_h(request):
+        await pace("model-versions")
+        mv = versions.get(int(request.match_info["id"]))
+        return web.json_response(mv) if mv else web.json_response({"error": "not found"}, status=404)
+
+    async def model_h(request):
+        await pace("models")
+        m = models.get(int(request.match_info["id"]))
+        return web.json_response(m) if m else web.json_response({"error": "not found"}, status=404)
+
+    async def images_h(request):
+        await pace("images")
+        mv_id = int(request.rel_url.query.get("modelVersionId", "0"))
+        if mv_id not in versions:
+            return web.json_response({"items": []})
+        return web.json_response({"items": [{
+            "url": versions[mv_id]["images"][0]["url"],
+            "meta": {"prompt": f"a photo, <lora:stub{mv_id}:0.75>", "negativePrompt": "blurry",
+                     "sampler": "Euler a", "steps": 25, "cfgScale": 7, "seed": mv_id, "Size": "768x1024"},
+        }]})
+
+    async def img_h(request):
+        await pace("img")
+        return web.Response(body=_jpeg(int(request.match_info["id"])), content_type="image/jpeg")
+
+    async def stats_h(request):
+        return web.json_response(dict(hits))
+
+    app = web.Application()
+    app.router.add_get("/api/v1/model-versions/by-hash/{h}", by_hash_h)
+    app.router.add_get("/api/v1/model-versions/{id:\\d+}", version_h)
+    app.router.add_get("/api/v1/models/{id:\\d+}", model_h)
+    app.router.add_get("/api/v1/images", images_h)
+    app.router.add_get("/img/{id:\\d+}.jpg", img_h)
+    app.router.add_get("/stats", stats_h)
+    return app
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="local civitai api stub")
+    ap.add_argument("paths", nargs="+", help="lora files, or dirs to scan")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0, help="added to every response")
+    ap.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with 429")
+    args = ap.parse_args(argv)
+
+    paths = [p for p in mhash._expand(args.paths) if os.path.isfile(p)]
+    fixtures = build_fixtures(paths, f"http://{args.host}:{args.port}")
+    print(f"stub api for {len(paths)} file(s) on http://{args.host}:{args.port}/api/v1", file=sys.stderr)
+    web.run_app(make_app(*fixtures, args.latency_ms, args.throttle_every), host=args.host, port=args.port,
+                print=None)
+
+
+if __name__ == "__main__":
+    main()
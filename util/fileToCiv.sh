@@ -10,22 +10,39 @@ For each LoRA file, resolves its Civitai modelVersionId via /model-versions/by-h
 then calls civs.sh like:
   civs.sh "https://civitai.com/?modelVersionId=<id>" <lora_file>
 
-Deps: curl jq sha256sum (optional: b3sum)
+Deps: curl jq, and python3 (uses ../mhash.py: parallel, cached hashing) or sha256sum (optional: b3sum)
 Env:
   CIVS_SH=/path/to/civs.sh   (optional override)
+  MHASH=/path/to/mhash.py    (optional override)
 USAGE
 }
 
 if [[ "${1:-}" == "-h" || "${1:-}" == "--help" ]]; then usage; exit 0; fi
 if [[ $# -lt 1 ]]; then usage; exit 1; fi
 
-for cmd in curl jq sha256sum; do
+for cmd in curl jq; do
   command -v "$cmd" >/dev/null 2>&1 || { echo "missing: $cmd" >&2; exit 1; }
 done
 
 SCRIPT_DIR="$(cd -- "$(dirname -- "${BASH_SOURCE[0]}")" && pwd)"
 CIVS_SH="${CIVS_SH:-$SCRIPT_DIR/civs.sh}"
 [[ -f "$CIVS_SH" ]] || { echo "civs.sh not found at: $CIVS_SH" >&2; exit 1; }
+MHASH="${MHASH:-$SCRIPT_DIR/../mhash.py}"
+
+# hash everything up front: one read per file, files in parallel, unchanged files come from the cache
+hashes_json="$(mktemp)"
+trap 'rm -f "$hashes_json"' EXIT
+echo "{}" >"$hashes_json"
+if command -v python3 >/dev/null 2>&1 && [[ -f "$MHASH" ]]; then
+  python3 "$MHASH" --json "$@" >"$hashes_json" 2>/dev/null || true
+  [[ -s "$hashes_json" ]] || echo "{}" >"$hashes_json"
+else
+  command -v sha256sum >/dev/null 2>&1 || { echo "missing: python3 or sha256sum" >&2; exit 1; }
+fi
+
+cached_hash() {
+  jq -r --arg p "$1" --arg f "$2" '.[$p][$f] // empty' "$hashes_json"
+}
 
 lookup_mv_id() {
   local h="$1" tmp
@@ -44,12 +61,16 @@ for lora in "$@"; do
     continue
   fi
 
-  sha256="$(sha256sum "$lora" | awk '{print $1}')"
+  sha256="$(cached_hash "$lora" sha256)"
+  [[ -n "$sha256" ]] || sha256="$(sha256sum "$lora" | awk '{print $1}')"
   mv_id="$(lookup_mv_id "$sha256" || true)"
 
-  if [[ -z "$mv_id" ]] && command -v b3sum >/dev/null 2>&1; then
-    blake3="$(b3sum "$lora" | awk '{print $1}')"
-    mv_id="$(lookup_mv_id "$blake3" || true)"
+  if [[ -z "$mv_id" ]]; then
+    blake3="$(cached_hash "$lora" blake3)"
+    if [[ -z "$blake3" ]] && command -v b3sum >/dev/null 2>&1; then
+      blake3="$(b3sum "$lora" | awk '{print $1}')"
+    fi
+    [[ -n "$blake3" ]] && mv_id="$(lookup_mv_id "$blake3" || true)"
   fi
 
   if [[ -z "$mv_id" ]]; then